@@ -43,6 +43,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the rest of the stack.
+    "testing_app.instrumentation.PerformanceMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -72,6 +74,19 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "project.wsgi.application"
 
+# Serve the async read-only routes under /api/async/ next to the sync API.
+ASYNC_READ_ROUTES = True
+
+
+# Per-view request metrics from PerformanceMiddleware, served at
+# /api/metrics/. Set SLOW_QUERY_MS to log slow queries and SQL repeated at
+# least DUPLICATE_QUERY_THRESHOLD times in one request (likely N+1).
+INSTRUMENTATION = {
+    "SAMPLES": 1000,
+    "SLOW_QUERY_MS": None,
+    "DUPLICATE_QUERY_THRESHOLD": 5,
+}
+
 
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
@@ -80,9 +95,61 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Keep connections open between requests, checking them before reuse.
+        "CONN_MAX_AGE": 60,
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# Safe-method requests to the product, brand and category APIs read from
+# READ_REPLICA["ALIAS"] when that alias is configured above. Clients that
+# wrote within STICKY_SECONDS stay on the primary, and responses read from the
+# replica are cached for at most STICKY_SECONDS. To try it locally with a
+# second SQLite file as the replica (kept in sync by hand with
+# `cp db.sqlite3 replica.sqlite3`), add:
+#
+#   DATABASES["replica"] = {
+#       "ENGINE": "django.db.backends.sqlite3",
+#       "NAME": BASE_DIR / "replica.sqlite3",
+#       "TEST": {"MIRROR": "default"},
+#   }
+
+DATABASE_ROUTERS = ["testing_app.routers.ReplicaRouter"]
+
+READ_REPLICA = {
+    "ALIAS": "replica",
+    "STICKY_SECONDS": 5,
+    "COOKIE_NAME": "primary_pinned",
+}
+
+# Applied to every new SQLite connection by testing_app.db. WAL lets readers
+# run alongside a writer; set a pragma to None to keep SQLite's default.
+SQLITE_PRAGMAS = {
+    "busy_timeout": 5000,
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "cache_size": -20000,
+    "mmap_size": 134217728,
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Swap BACKEND for django.core.cache.backends.redis.RedisCache to share the
+# response cache (and its invalidation) between processes.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+RESPONSE_CACHE = {
+    "ALIAS": "default",
+    "TIMEOUT": 300,
+    "KEY_PREFIX": "response",
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -102,6 +169,31 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# https://docs.djangoproject.com/en/5.0/topics/auth/passwords/
+# PASSWORD_HASH_ITERATIONS is the PBKDF2 work factor and dominates the cost
+# of POST /api/register/. Lowering it raises registration throughput at the
+# expense of brute-force resistance; benchmark_register measures the trade.
+# Production keeps Django's own default: the throughput gain comes from the
+# registration path itself, and the stored hashes are not weakened to buy it.
+
+PASSWORD_HASHERS = [
+    "testing_app.hashers.ConfigurablePBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
+PASSWORD_HASH_ITERATIONS = 720000
+
+
+# Testing
+# testing_app.test_runner keeps media in memory and lowers the password
+# work factor for the test run. `manage.py test --parallel` is supported.
+
+TEST_RUNNER = "testing_app.test_runner.TestRunner"
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
@@ -120,6 +212,49 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Uploads
+# Every upload is streamed to a temporary file in chunks instead of being
+# buffered in memory. testing_app.media moves it to STAGING_DIR and verifies
+# and stores it in a pool of WORKERS background threads, tracking progress
+# in Product.media_status.
+
+FILE_UPLOAD_HANDLERS = [
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+
+MEDIA_PROCESSING = {
+    "WORKERS": 2,
+}
+
+# Downscaled copies of each product image, rendered once per upload and
+# served as RetrieveProductSerializer's srcset. Widths at or above the
+# original's are skipped.
+PRODUCT_IMAGE_RENDITIONS = {
+    "WIDTHS": [160, 320, 640, 1280],
+    "FORMAT": "WEBP",
+    "QUALITY": 80,
+    "DIRECTORY": "products/renditions",
+}
+
+# Base URL media is served from in production, e.g.
+# "https://cdn.example.com/media/". When set, product image and file URLs are
+# built from it instead of the storage URL.
+MEDIA_CDN_URL = None
+
+# Product full-text search (SQLite FTS5), see testing_app.search. WEIGHTS are
+# the bm25 weights of a match in the product name, brand name and category
+# names.
+PRODUCT_SEARCH = {
+    "WEIGHTS": (10.0, 5.0, 2.0),
+}
+
+# With DENORMALIZED_READS, product lists (list, stream and search) read the
+# brand and categories from the denormalized Product.listing column instead of
+# joining them. Opt-in; the column is maintained either way.
+PRODUCT_LISTING = {
+    "DENORMALIZED_READS": False,
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -127,6 +262,14 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
-}
\ No newline at end of file
+        'testing_app.authentication.CachedJWTAuthentication',
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'testing_app.pagination.KeysetCursorPagination',
+    'PAGE_SIZE': 50,
+}
+
+JWT_AUTH_CACHE = {
+    "MAX_TOKENS": 10000,
+    "MAX_USERS": 1000,
+    "USER_TTL": 60,
+}
@@ -15,6 +15,7 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework_simplejwt.views import (
@@ -22,8 +23,8 @@ from rest_framework_simplejwt.views import (
     TokenRefreshView,
 )
 
-from testing_app.views import RegisterView
-from testing_app.urls import router
+from testing_app.views import CatalogStatsView, MetricsView, RegisterView
+from testing_app.urls import router, async_urlpatterns
 
 
 urlpatterns = [
@@ -31,5 +32,10 @@ urlpatterns = [
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/register/', RegisterView.as_view(), name='register'),
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
+    path('api/stats/', CatalogStatsView.as_view(), name='stats'),
     path("api/", include(router.urls))
 ]
+
+if settings.ASYNC_READ_ROUTES:
+    urlpatterns.insert(-1, path("api/async/", include(async_urlpatterns)))
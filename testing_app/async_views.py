@@ -0,0 +1,88 @@
+from contextlib import nullcontext
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.response import Response
+from .routers import replica_routing
+from .views import BrandViewSet, CategoryViewSet, ProductViewSet, ReplicaReadMixin
+
+
+class AsyncReadView(View):
+    """
+    ASGI-native list/retrieve for a router viewset.
+
+    The request goes through the viewset's own `initial()` (content
+    negotiation, authentication, permissions, throttling and the replica
+    routing decision), response cache lookup, `handle_exception()` and
+    `finalize_response()` (rendering, caching, ETag/304 and primary pinning),
+    so both routes apply the same policies and return the same payloads.
+    Those steps and serialization run in a worker thread; only the database
+    reads differ: the page is read with `aiterator()` (which runs the
+    viewset's prefetches) and single objects with `aget()`, so the event loop
+    is never blocked on a whole sync view.
+    """
+    viewset_class = None
+
+    async def get(self, request, pk=None):
+        action = 'list' if pk is None else 'retrieve'
+        kwargs = {} if pk is None else {'pk': pk}
+        viewset = self.viewset_class(
+            request=None, args=(), kwargs=kwargs, action_map={'get': action}, format_kwarg=None
+        )
+        drf_request = viewset.initialize_request(request, **kwargs)
+        viewset.request = drf_request
+        viewset.headers = viewset.default_response_headers
+
+        if isinstance(viewset, ReplicaReadMixin):
+            routing = replica_routing()
+        else:
+            routing = nullcontext()
+        with routing as viewset.replica_routing:
+            try:
+                await sync_to_async(viewset.initial)(drf_request, **kwargs)
+                response = await sync_to_async(viewset.get_cached_response)(drf_request)
+                if response is None:
+                    if pk is None:
+                        response = await self.list(viewset, drf_request)
+                    else:
+                        response = await self.retrieve(viewset, drf_request, pk)
+            except Exception as exc:
+                response = await sync_to_async(viewset.handle_exception)(exc)
+            return await sync_to_async(viewset.finalize_response)(drf_request, response, **kwargs)
+
+    async def list(self, viewset, request):
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        paginator = viewset.paginator
+        if paginator is None:
+            page = [obj async for obj in queryset.aiterator()]
+            return Response(await self.serialize(viewset, page, many=True))
+        page = await paginator.apaginate_queryset(queryset, request, view=viewset)
+        data = await self.serialize(viewset, page, many=True)
+        return viewset.get_paginated_response(data)
+
+    async def retrieve(self, viewset, request, pk):
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        try:
+            instance = await queryset.aget(pk=pk)
+        except (ObjectDoesNotExist, ValueError):
+            raise exceptions.NotFound()
+        await sync_to_async(viewset.check_object_permissions)(request, instance)
+        return Response(await self.serialize(viewset, instance))
+
+    async def serialize(self, viewset, instance, **kwargs):
+        # Serializers may touch lazy relations and take a while on big
+        # pages, so they stay off the event loop.
+        return await sync_to_async(lambda: viewset.get_serializer(instance, **kwargs).data)()
+
+
+class AsyncProductView(AsyncReadView):
+    viewset_class = ProductViewSet
+
+
+class AsyncBrandView(AsyncReadView):
+    viewset_class = BrandViewSet
+
+
+class AsyncCategoryView(AsyncReadView):
+    viewset_class = CategoryViewSet
@@ -0,0 +1,112 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+JWT_AUTH_CACHE_DEFAULTS = {
+    'MAX_TOKENS': 10000,
+    'MAX_USERS': 1000,
+    'USER_TTL': 60,
+}
+
+
+def get_jwt_auth_cache_setting(name):
+    return getattr(settings, 'JWT_AUTH_CACHE', {}).get(name, JWT_AUTH_CACHE_DEFAULTS[name])
+
+
+class ExpiringLRUCache:
+    """
+    A small thread-safe LRU mapping whose entries also carry an expiry time.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at):
+        with self.lock:
+            self.entries[key] = (value, expires_at)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+validated_tokens = ExpiringLRUCache(get_jwt_auth_cache_setting('MAX_TOKENS'))
+authenticated_users = ExpiringLRUCache(get_jwt_auth_cache_setting('MAX_USERS'))
+
+
+def invalidate_cached_user(user_id):
+    authenticated_users.delete(str(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that memoizes signature verification and the user row.
+
+    Validated tokens are kept in a bounded LRU until they expire. The entry is
+    keyed on the whole encoded token rather than its `jti`: a forged token can
+    claim any `jti`, so only an exact match may skip verification. Users are
+    cached by id for `USER_TTL` seconds and dropped when the row is saved or
+    deleted (see `testing_app.signals`).
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = validated_tokens.get(raw_token)
+        if validated_token is None:
+            validated_token = super().get_validated_token(raw_token)
+            validated_tokens.set(raw_token, validated_token, validated_token['exp'])
+        return validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = str(validated_token[api_settings.USER_ID_CLAIM])
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = authenticated_users.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            expires_at = time.time() + get_jwt_auth_cache_setting('USER_TTL')
+            authenticated_users.set(user_id, user, expires_at)
+        else:
+            # The user may be cached from another token, so the per-token
+            # revocation check still has to run.
+            if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+        # Hand each request its own copy so per-request changes to
+        # request.user do not leak into the cache.
+        return copy.copy(user)
@@ -0,0 +1,161 @@
+import hashlib
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from rest_framework.response import Response
+
+RESPONSE_CACHE_DEFAULTS = {
+    'ALIAS': 'default',
+    'TIMEOUT': 300,
+    'KEY_PREFIX': 'response',
+}
+
+
+def get_response_cache_setting(name):
+    return getattr(settings, 'RESPONSE_CACHE', {}).get(name, RESPONSE_CACHE_DEFAULTS[name])
+
+
+def get_response_cache():
+    return caches[get_response_cache_setting('ALIAS')]
+
+
+def get_version_key(label):
+    return f"{get_response_cache_setting('KEY_PREFIX')}:version:{label}"
+
+
+def bump_response_cache_version(label):
+    """
+    Invalidate every cached response that depends on `label`.
+
+    Cache keys embed the current version of each dependency, so bumping the
+    version orphans the old entries without having to find and delete them.
+
+    Inside a transaction the version is bumped again once it commits: a
+    concurrent read in between still sees the old rows but would cache
+    them under the new version.
+    """
+    increment_version(label)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: increment_version(label))
+
+
+def increment_version(label):
+    # Only `add` and `incr` are used, which every Django cache backend
+    # (including Redis) supports atomically.
+    cache = get_response_cache()
+    key = get_version_key(label)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr().
+        cache.set(key, 1, None)
+
+
+def get_etag(content):
+    return quote_etag(hashlib.md5(content).hexdigest())
+
+
+def etag_matches(request, etag):
+    if_none_match = request.headers.get('If-None-Match')
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return '*' in etags or etag in etags
+
+
+class CachedResponseMixin:
+    """
+    Caches rendered list/retrieve responses and answers conditional requests.
+
+    Entries are keyed on the full URL, the negotiated format, the requesting
+    user and the current version of each label in `cache_dependencies`.
+    Versions are bumped by the model signals in `testing_app.signals`.
+    """
+    cache_dependencies = ()
+    cached_actions = ('list', 'retrieve')
+
+    def is_response_cacheable(self, request):
+        # A response rendered inside an open transaction may show rows that
+        # are later rolled back, so it must neither be stored nor served.
+        return (
+            request.method == 'GET'
+            and self.action in self.cached_actions
+            and not connection.in_atomic_block
+        )
+
+    def get_response_cache_key(self, request):
+        cache = get_response_cache()
+        version_keys = [get_version_key(label) for label in self.cache_dependencies]
+        versions = cache.get_many(version_keys)
+        user = request.user
+        parts = [
+            request.get_full_path(),
+            request.accepted_renderer.format,
+            user.pk if user and user.is_authenticated else 'anon',
+        ]
+        parts.extend(versions.get(key, 0) for key in version_keys)
+        digest = hashlib.sha256('|'.join(map(str, parts)).encode()).hexdigest()
+        return f"{get_response_cache_setting('KEY_PREFIX')}:{self.basename}:{digest}"
+
+    def get_response_cache_timeout(self):
+        return get_response_cache_setting('TIMEOUT')
+
+    def get_cached_response(self, request):
+        self.response_cache_key = None
+        if not self.is_response_cacheable(request):
+            return None
+        self.response_cache_key = self.get_response_cache_key(request)
+        cached = get_response_cache().get(self.response_cache_key)
+        if cached is None:
+            return None
+        content, content_type, etag = cached
+        if etag_matches(request, etag):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        response = self.get_cached_response(request)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        response = self.get_cached_response(request)
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if not (
+            isinstance(response, Response)
+            and response.status_code == 200
+            and request.method == 'GET'
+            and self.action in self.cached_actions
+        ):
+            return response
+
+        response.render()
+        etag = get_etag(response.content)
+        response['ETag'] = etag
+        cache_key = getattr(self, 'response_cache_key', None)
+        if cache_key is not None:
+            get_response_cache().set(
+                cache_key,
+                (response.content, response['Content-Type'], etag),
+                self.get_response_cache_timeout(),
+            )
+        if etag_matches(request, etag):
+            not_modified = HttpResponseNotModified()
+            not_modified['ETag'] = etag
+            if response.has_header('Vary'):
+                patch_vary_headers(not_modified, response['Vary'].split(', '))
+            return not_modified
+        return response
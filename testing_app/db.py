@@ -0,0 +1,34 @@
+from django.conf import settings
+
+SQLITE_PRAGMAS_DEFAULTS = {
+    # Set first so switching the journal mode waits for other connections.
+    'busy_timeout': 5000,
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'cache_size': -20000,
+    'mmap_size': 134217728,
+}
+
+
+def get_sqlite_pragmas():
+    """
+    Return the pragmas from `SQLITE_PRAGMAS` merged over the defaults.
+    A pragma set to None is left at SQLite's own default.
+    """
+    pragmas = {**SQLITE_PRAGMAS_DEFAULTS, **getattr(settings, 'SQLITE_PRAGMAS', {})}
+    return {name: value for name, value in pragmas.items() if value is not None}
+
+
+def configure_sqlite_connection(connection):
+    """
+    Apply the configured pragmas to a freshly opened SQLite connection.
+
+    With WAL, readers no longer block on a writer (and the other way round),
+    and `synchronous=NORMAL` only syncs at checkpoints, which is still safe
+    against corruption in that mode. The raw connection is used so the
+    statements stay out of `connection.queries`.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in get_sqlite_pragmas().items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
@@ -1,27 +1,52 @@
+import functools
 import factory
 from .models import Brand, Category, Product
 from factory.django import DjangoModelFactory
 
 
+@functools.cache
+def make_image_data(width, height, color, image_format, palette):
+    return factory.django.ImageField._make_data(None, {
+        'width': width, 'height': height, 'color': color, 'format': image_format, 'palette': palette,
+    })
+
+
+class CachedImageField(factory.django.ImageField):
+    """
+    ImageField that renders each distinct image once and reuses the bytes.
+    """
+
+    def _make_data(self, params):
+        width = params.get('width', 100)
+        return make_image_data(
+            width,
+            params.get('height', width),
+            params.get('color', 'blue'),
+            params.get('format', 'JPEG'),
+            params.get('palette', 'RGB'),
+        )
+
+
 class BrandFactory(DjangoModelFactory):
     class Meta:
         model = Brand
 
-    name = factory.Faker('company')
+    # Names are unique, so number them rather than rely on Faker not repeating.
+    name = factory.Sequence(lambda n: f'brand-{n}')
 
 class CategoryFactory(DjangoModelFactory):
     class Meta:
         model = Category
 
-    name = factory.Faker('word')
+    name = factory.Sequence(lambda n: f'category-{n}')
 
 class ProductFactory(DjangoModelFactory):
     class Meta:
         model = Product
 
-    name = factory.Faker('word')
+    name = factory.Sequence(lambda n: f'product-{n}')
     brand = factory.SubFactory(BrandFactory)
-    image = factory.django.ImageField(color='blue')
+    image = CachedImageField(color='blue')
     file = factory.django.FileField(filename='test.pdf')
     price = factory.Faker('pydecimal', left_digits=5, right_digits=2, positive=True)
     stock = factory.Faker('random_int', min=1, max=100)
@@ -40,5 +65,3 @@ class ProductFactory(DjangoModelFactory):
             # Create random categories
             for _ in range(2):
                 self.category.add(CategoryFactory())
-
-
@@ -0,0 +1,81 @@
+from decimal import Decimal, InvalidOperation
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+
+class RangeFilterBackend(BaseFilterBackend):
+    """
+    Filters on `?min_<name>=` / `?max_<name>=` for every name listed in the
+    view's `range_filter_fields`. Names may refer to annotations.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        for name in getattr(view, 'range_filter_fields', []):
+            for prefix, lookup in (('min', 'gte'), ('max', 'lte')):
+                param = f'{prefix}_{name}'
+                value = request.query_params.get(param)
+                if value is None:
+                    continue
+                try:
+                    value = Decimal(value)
+                except InvalidOperation:
+                    value = None
+                if value is None or not value.is_finite():
+                    raise ValidationError({param: 'A valid number is required.'})
+                queryset = queryset.filter(**{f'{name}__{lookup}': value})
+        return queryset
+
+
+class RelatedFilterBackend(BaseFilterBackend):
+    """
+    Filters on `?<name>=<pk>[,<pk>...]` for every relation listed in the
+    view's `related_filter_fields`. Many-to-many relations are matched with
+    an `IN (SELECT ...)` on the through table rather than a join, so rows are
+    never duplicated and the database can search the through table's index
+    on the related id.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        for name in getattr(view, 'related_filter_fields', []):
+            value = request.query_params.get(name)
+            if value is None:
+                continue
+            try:
+                pks = [int(pk) for pk in value.split(',')]
+            except ValueError:
+                raise ValidationError({name: 'A comma separated list of ids is required.'})
+
+            field = queryset.model._meta.get_field(name)
+            if field.many_to_many:
+                through = field.remote_field.through
+                matches = through.objects.filter(**{
+                    f'{field.m2m_reverse_field_name()}__in': pks,
+                }).values(field.m2m_field_name())
+                queryset = queryset.filter(pk__in=matches)
+            else:
+                queryset = queryset.filter(**{f'{name}__in': pks})
+        return queryset
+
+
+class BooleanFilterBackend(BaseFilterBackend):
+    """
+    Filters on `?<name>=true|false` for every name in the view's
+    `boolean_filters`, a mapping of parameter name to the Q object that
+    holds when the value is true.
+    """
+    true_values = {'true', '1', 'yes'}
+    false_values = {'false', '0', 'no'}
+
+    def filter_queryset(self, request, queryset, view):
+        for name, condition in getattr(view, 'boolean_filters', {}).items():
+            value = request.query_params.get(name)
+            if value is None:
+                continue
+            value = value.lower()
+            if value in self.true_values:
+                queryset = queryset.filter(condition)
+            elif value in self.false_values:
+                queryset = queryset.exclude(condition)
+            else:
+                raise ValidationError({name: 'Must be true or false.'})
+        return queryset
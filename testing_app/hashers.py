@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with the work factor taken from `PASSWORD_HASH_ITERATIONS`.
+
+    It keeps the stock `pbkdf2_sha256` algorithm name and every hash records
+    its own iteration count, so existing passwords keep verifying. They are
+    rehashed at the configured cost the next time the user logs in.
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_HASH_ITERATIONS', PBKDF2PasswordHasher.iterations)
@@ -0,0 +1,50 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_identity_map = ContextVar('identity_map', default=None)
+
+
+@contextmanager
+def identity_map():
+    """
+    Resolve each related row at most once for the duration of the block,
+    e.g. a request validating many items that share a brand.
+
+    The map lives only as long as the block: rows are never reused across
+    requests, where a delete in another process or a rolled back insert
+    would leave them pointing at rows that no longer exist.
+    """
+    token = _identity_map.set({})
+    try:
+        yield
+    finally:
+        _identity_map.reset(token)
+
+
+def get_related_objects(queryset, pks):
+    """
+    Return a mapping of each pk in `pks` that exists in `queryset` to its
+    object, like `queryset.in_bulk(pks)`.
+
+    Rows already in the current identity map are not queried again, and the
+    rest are fetched in one query. Filtered querysets bypass the map, since
+    a row found for one queryset may not belong to another.
+    """
+    scope = _identity_map.get()
+    if scope is None or queryset.query.where:
+        return queryset.in_bulk(pks)
+
+    label = queryset.model._meta.label
+    found, missing = {}, []
+    for pk in pks:
+        obj = scope.get((label, pk))
+        if obj is None:
+            missing.append(pk)
+        else:
+            found[pk] = obj
+    if missing:
+        fetched = queryset.in_bulk(missing)
+        for pk, obj in fetched.items():
+            scope[(label, pk)] = obj
+        found.update(fetched)
+    return found
@@ -0,0 +1,244 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+INSTRUMENTATION_DEFAULTS = {
+    # Samples kept per view for the percentiles of the metrics endpoint.
+    'SAMPLES': 1000,
+    # Log queries slower than this many milliseconds; None disables the log.
+    'SLOW_QUERY_MS': None,
+    # With the slow query log on, also log SQL run at least this many times
+    # in one request as a likely N+1.
+    'DUPLICATE_QUERY_THRESHOLD': 5,
+}
+
+
+def get_instrumentation_setting(name):
+    return getattr(settings, 'INSTRUMENTATION', {}).get(name, INSTRUMENTATION_DEFAULTS[name])
+
+
+def percentiles(timings, points=(50, 95, 99)):
+    timings = sorted(timings)
+    return {
+        f'p{point}': timings[min(len(timings) - 1, len(timings) * point // 100)]
+        for point in points
+    }
+
+
+class RequestMetrics:
+    """
+    What one request spent its time on. Durations are in milliseconds.
+    """
+
+    def __init__(self):
+        self.view = None
+        self.queries = []
+        self.db_ms = 0.0
+        self.serialize_ms = 0.0
+        self.render_started = None
+
+    def record_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            self.db_ms += duration
+            self.queries.append((sql, duration))
+
+
+_current_metrics = ContextVar('request_metrics', default=None)
+
+
+def get_current_metrics():
+    """
+    Return the RequestMetrics of the request being handled, if any.
+    """
+    return _current_metrics.get()
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Execute wrapper that times the query into the current request's metrics.
+
+    It stays installed on every connection (see `install_query_recorder`)
+    because connections are per thread: the ones `sync_to_async` uses under
+    ASGI are not the ones open in the event-loop thread. The metrics come
+    from the context, which does follow the request into those threads.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics.record_query(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class MetricsRegistry:
+    """
+    In-process store of the most recent samples of each metric per view.
+    """
+    metrics = ('total_ms', 'db_ms', 'db_queries', 'serialize_ms', 'render_ms', 'response_bytes')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(lambda: {
+            metric: deque(maxlen=get_instrumentation_setting('SAMPLES'))
+            for metric in self.metrics
+        })
+        self.counts = Counter()
+
+    def record(self, view, values):
+        with self.lock:
+            self.counts[view] += 1
+            samples = self.samples[view]
+            for metric, value in values.items():
+                samples[metric].append(value)
+
+    def summary(self):
+        with self.lock:
+            return {
+                view: {
+                    'count': self.counts[view],
+                    **{
+                        metric: percentiles(values)
+                        for metric, values in samples.items()
+                        if values
+                    },
+                }
+                for view, samples in sorted(self.samples.items())
+            }
+
+    def clear(self):
+        with self.lock:
+            self.samples.clear()
+            self.counts.clear()
+
+
+registry = MetricsRegistry()
+
+
+def get_view_label(view_func, method):
+    """
+    Name a view for the metrics, e.g. `ProductViewSet.list`.
+    """
+    view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    if view_class is None:
+        return getattr(view_func, '__qualname__', repr(view_func))
+    actions = getattr(view_func, 'actions', None)
+    if actions:
+        handler = actions.get(method.lower(), method.lower())
+    else:
+        handler = method.lower()
+    return f'{view_class.__name__}.{handler}'
+
+
+_whitespace = re.compile(r'\s+')
+
+
+def log_queries(view, queries):
+    slow_ms = get_instrumentation_setting('SLOW_QUERY_MS')
+    if slow_ms is None:
+        return
+    for sql, duration in queries:
+        if duration >= slow_ms:
+            logger.warning("Slow query in %s (%.1fms): %s", view, duration, sql)
+    # Parameters are not part of the SQL, so repeats differ only in them.
+    repeated = Counter(_whitespace.sub(' ', sql) for sql, _ in queries)
+    threshold = get_instrumentation_setting('DUPLICATE_QUERY_THRESHOLD')
+    for sql, count in repeated.items():
+        if count >= threshold:
+            logger.warning("Possible N+1 in %s, %d runs of: %s", view, count, sql)
+
+
+class PerformanceMiddleware:
+    """
+    Times every request and reports it in a `Server-Timing` header and in
+    `registry`, tagged with the view that handled it.
+
+    Database time and query count come from `record_query`, installed on
+    every connection as it opens. Serialization time is added by the read serializers (see
+    SerializationTimingMixin), and render time covers DRF's deferred
+    rendering, which happens after `process_template_response`.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Stay async under ASGI so async views are not adapted to sync.
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.report(metrics, start, response)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.report(metrics, start, response)
+
+    def report(self, metrics, start, response):
+        end = time.perf_counter()
+        total_ms = (end - start) * 1000
+        render_ms = 0.0
+        if metrics.render_started is not None:
+            render_ms = (end - metrics.render_started) * 1000
+
+        view = metrics.view or 'unresolved'
+        values = {
+            'total_ms': total_ms,
+            'db_ms': metrics.db_ms,
+            'db_queries': len(metrics.queries),
+            'serialize_ms': metrics.serialize_ms,
+            'render_ms': render_ms,
+        }
+        if not response.streaming:
+            values['response_bytes'] = len(response.content)
+        registry.record(view, values)
+        log_queries(view, metrics.queries)
+
+        response['Server-Timing'] = ', '.join([
+            f'total;dur={total_ms:.1f}',
+            f'db;dur={metrics.db_ms:.1f};desc="{len(metrics.queries)} queries"',
+            f'serialize;dur={metrics.serialize_ms:.1f}',
+            f'render;dur={render_ms:.1f}',
+        ])
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = _current_metrics.get()
+        if metrics is not None:
+            metrics.view = get_view_label(view_func, request.method)
+
+    def process_template_response(self, request, response):
+        # Rendering starts right after this hook.
+        metrics = _current_metrics.get()
+        if metrics is not None:
+            metrics.render_started = time.perf_counter()
+        return response
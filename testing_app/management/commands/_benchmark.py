@@ -0,0 +1,54 @@
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import transaction
+from django.test.utils import setup_databases, teardown_databases
+
+
+class Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back():
+    """
+    Run the benchmark body in a transaction that is always rolled back, so
+    seeded rows never reach the database.
+    """
+    try:
+        with transaction.atomic():
+            yield
+            raise Rollback
+    except Rollback:
+        pass
+
+
+def median_ms(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+@contextmanager
+def test_database():
+    """
+    Run the benchmark against a throwaway file-backed copy of the schema.
+
+    Needed when the benchmark writes from several threads, which cannot
+    share the rolled-back transaction of `rolled_back()`.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        for alias, database in settings.DATABASES.items():
+            database.setdefault('TEST', {})['NAME'] = os.path.join(directory, f'{alias}.sqlite3')
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            yield
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
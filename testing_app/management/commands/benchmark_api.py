@@ -0,0 +1,210 @@
+import io
+import json
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import django
+import rest_framework
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework_simplejwt.tokens import AccessToken
+from testing_app.instrumentation import percentiles
+from testing_app.media import shutdown_executor
+from testing_app.models import Brand, Category, Product
+from testing_app.seeding import seed_catalog
+from ._benchmark import test_database
+
+_query_count = re.compile(r'desc="(\d+) queries"')
+
+
+def get_png():
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 64), 'blue').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a deterministic catalog into a throwaway database and measure "
+        "list, retrieve, create and filter requests on every router endpoint. "
+        "Prints the results as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=10000)
+        parser.add_argument('--brands', type=int, default=100)
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=200, help="Requests per scenario.")
+        parser.add_argument('--concurrency', type=int, default=1)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help="Write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        # Measure the views themselves, not the response cache.
+        dummy_cache = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        with (
+            tempfile.TemporaryDirectory() as media_root,
+            test_database(),
+            override_settings(
+                CACHES=dummy_cache,
+                ALLOWED_HOSTS=['localhost'],
+                MEDIA_ROOT=media_root,
+                MEDIA_PROCESSING={'STAGING_DIR': f'{media_root}/staging'},
+            ),
+        ):
+            seed_catalog(
+                options['products'],
+                brands=options['brands'],
+                categories=options['categories'],
+                seed=options['seed'],
+            )
+            user = User.objects.create_user(username='benchmark-user', password='benchmark-password')
+            self.headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+            self.png = get_png()
+            try:
+                results = {
+                    name: self.run(request, options)
+                    for name, request in self.get_scenarios().items()
+                }
+            finally:
+                # Let media processing of the created products finish before
+                # the database goes away.
+                shutdown_executor()
+                connections.close_all()
+
+        report = json.dumps({
+            'meta': {
+                'products': options['products'],
+                'brands': options['brands'],
+                'categories': options['categories'],
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+                'seed': options['seed'],
+                'python': '.'.join(map(str, sys.version_info[:3])),
+                'django': django.get_version(),
+                'djangorestframework': rest_framework.VERSION,
+            },
+            'scenarios': results,
+        }, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(report + '\n')
+        self.stdout.write(report)
+
+    def get_scenarios(self):
+        """
+        Map each scenario name to a function that takes a client, a random
+        generator and a sequence number and returns the response.
+        """
+        category_ids = list(Category.objects.values_list('pk', flat=True))
+        brand_ids = list(Brand.objects.values_list('pk', flat=True))
+        product_ids = list(Product.objects.values_list('pk', flat=True))
+        headers = self.headers
+
+        def get(path, **params):
+            return lambda client, rng, n: client.get(path, params, **headers)
+
+        def create_product(client, rng, n):
+            return client.post(reverse('product-list'), {
+                'name': f'benchmark-product-{n}',
+                'brand': rng.choice(brand_ids),
+                'category': rng.sample(category_ids, min(2, len(category_ids))),
+                'image': SimpleUploadedFile('benchmark.png', self.png, 'image/png'),
+                'file': SimpleUploadedFile('benchmark.pdf', b'%PDF-1.4', 'application/pdf'),
+                'price': '19.99',
+                'stock': rng.randrange(100),
+            }, **headers)
+
+        scenarios = {}
+        for basename, ids in (
+            ('category', category_ids),
+            ('brand', brand_ids),
+            ('product', product_ids),
+        ):
+            scenarios[f'{basename}-list'] = get(reverse(f'{basename}-list'))
+            scenarios[f'{basename}-retrieve'] = (
+                lambda client, rng, n, basename=basename, ids=ids: client.get(
+                    reverse(f'{basename}-detail', args=[rng.choice(ids)]), **headers
+                )
+            )
+            if basename != 'product':
+                scenarios[f'{basename}-create'] = (
+                    lambda client, rng, n, basename=basename: client.post(
+                        reverse(f'{basename}-list'),
+                        {'name': f'benchmark-{basename}-{n}'},
+                        content_type='application/json',
+                        **headers,
+                    )
+                )
+        scenarios['product-create'] = create_product
+        scenarios['product-filter-price'] = get(
+            reverse('product-list'), min_price='1000', max_price='5000'
+        )
+        scenarios['product-filter-brand'] = (
+            lambda client, rng, n: client.get(
+                reverse('product-list'), {'brand': rng.choice(brand_ids)}, **headers
+            )
+        )
+        scenarios['product-filter-category'] = (
+            lambda client, rng, n: client.get(
+                reverse('product-list'), {'category': rng.choice(category_ids)}, **headers
+            )
+        )
+        scenarios['product-filter-in-stock'] = get(reverse('product-list'), in_stock='true')
+        scenarios['product-ordering-price'] = get(reverse('product-list'), ordering='-price')
+        return scenarios
+
+    def run(self, request, options):
+        jobs = list(range(options['requests']))
+        lock = threading.Lock()
+        timings, queries, errors = [], [], []
+
+        def worker(index):
+            client = Client(SERVER_NAME='localhost', raise_request_exception=False)
+            rng = random.Random(options['seed'] * 1000 + index)
+            while True:
+                with lock:
+                    if not jobs:
+                        break
+                    n = jobs.pop()
+                start = time.perf_counter()
+                response = request(client, rng, n)
+                timings.append((time.perf_counter() - start) * 1000)
+                if response.status_code >= 400:
+                    errors.append(response.status_code)
+                match = _query_count.search(response.get('Server-Timing', ''))
+                if match:
+                    queries.append(int(match.group(1)))
+            connections.close_all()
+
+        threads = [
+            threading.Thread(target=worker, args=(index,))
+            for index in range(options['concurrency'])
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - start
+
+        return {
+            'requests': options['requests'],
+            'errors': len(errors),
+            'throughput_rps': round(options['requests'] / wall, 1),
+            'latency_ms': {
+                name: round(value, 2) for name, value in percentiles(timings).items()
+            },
+            'queries': {
+                'mean': round(sum(queries) / len(queries), 1) if queries else None,
+                'max': max(queries, default=None),
+            },
+        }
@@ -0,0 +1,91 @@
+import asyncio
+import time
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from testing_app.instrumentation import percentiles
+from testing_app.seeding import seed_catalog
+from ._benchmark import test_database
+
+
+class Command(BaseCommand):
+    help = "Compare concurrent throughput of the sync and async read routes under ASGI."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=500)
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=50)
+
+    def handle(self, *args, **options):
+        # Measure the views themselves, not the response cache.
+        dummy_cache = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        with test_database(), override_settings(CACHES=dummy_cache, ALLOWED_HOSTS=['localhost']):
+            seed_catalog(options['products'])
+            application = get_asgi_application()
+            for label, path in (
+                ('sync', '/api/products/'),
+                ('async', '/api/async/products/'),
+                ('sync', '/api/products/1/'),
+                ('async', '/api/async/products/1/'),
+            ):
+                result = asyncio.run(
+                    self.run(application, path, options['requests'], options['concurrency'])
+                )
+                self.stdout.write(f"{label:<6} {path:<24} {result}")
+
+    async def run(self, application, path, requests, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+        timings, statuses = [], []
+
+        async def request():
+            async with semaphore:
+                start = time.perf_counter()
+                statuses.append(await self.call(application, path))
+                timings.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(request() for _ in range(requests)))
+        wall = time.perf_counter() - start
+        latency = percentiles(timings)
+        errors = sum(1 for status_code in statuses if status_code != 200)
+        return (
+            f"throughput={requests / wall:.1f}req/s "
+            + " ".join(f"{name}={value:.1f}ms" for name, value in latency.items())
+            + f" errors={errors}"
+        )
+
+    async def call(self, application, path):
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': b'',
+            'root_path': '',
+            'headers': [(b'host', b'localhost')],
+            'client': ('127.0.0.1', 0),
+            'server': ('localhost', 80),
+        }
+        status_code = None
+        body_sent = False
+        disconnected = asyncio.Event()
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            # Django listens for a disconnect until the response is sent.
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+
+        await application(scope, receive, send)
+        return status_code
@@ -0,0 +1,32 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+from testing_app.authentication import CachedJWTAuthentication, authenticated_users, validated_tokens
+from ._benchmark import median_ms, rolled_back
+
+
+class Command(BaseCommand):
+    help = "Compare per-request JWT authentication overhead with and without caching."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self.run(options['repeat'])
+
+    def run(self, repeat):
+        user = User.objects.create_user(username='benchmark-user', password='benchmark-password')
+        token = str(AccessToken.for_user(user))
+        request = APIRequestFactory().get('/api/brands/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        validated_tokens.clear()
+        authenticated_users.clear()
+
+        for name, authentication in (
+            ('JWTAuthentication', JWTAuthentication()),
+            ('CachedJWTAuthentication', CachedJWTAuthentication()),
+        ):
+            median = median_ms(repeat, lambda: authentication.authenticate(request))
+            self.stdout.write(f"{name:<24} median={median * 1000:.1f}us")
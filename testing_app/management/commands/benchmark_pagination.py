@@ -0,0 +1,76 @@
+from base64 import b64encode
+from decimal import Decimal
+from urllib.parse import urlencode
+from django.core.management.base import BaseCommand
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from testing_app.models import Brand, Product
+from testing_app.pagination import KeysetCursorPagination
+from ._benchmark import median_ms, rolled_back
+
+
+class Command(BaseCommand):
+    help = "Compare keyset cursor and offset pagination latency at page 1 and a deep page."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=10)
+        parser.add_argument('--page', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self.run(options['page_size'], options['page'], options['repeat'])
+
+    def seed(self, count):
+        brand = Brand.objects.create(name='benchmark-brand')
+        Product.objects.bulk_create(
+            (
+                Product(
+                    name=f'benchmark-{i}',
+                    brand=brand,
+                    image='products/benchmark.png',
+                    file='files/benchmark.pdf',
+                    price=Decimal(i % 1000) + Decimal('0.99'),
+                    stock=i % 100,
+                )
+                for i in range(count)
+            ),
+            batch_size=5000,
+        )
+
+    def run(self, page_size, page, repeat):
+        count = page_size * page
+        self.stdout.write(f"Seeding {count} products...")
+        self.seed(count)
+
+        factory = APIRequestFactory(SERVER_NAME='localhost')
+        queryset = Product.objects.all()
+        for ordering in (('id',), ('price', 'id')):
+            label = ','.join(ordering)
+            paginator = KeysetCursorPagination()
+            deep = queryset.order_by(*ordering)[(page - 1) * page_size - 1]
+            position = paginator._get_position_from_instance(deep, ordering)
+            cursor = b64encode(urlencode({'p': position}).encode('ascii')).decode('ascii')
+
+            def keyset(params):
+                paginator = KeysetCursorPagination()
+                paginator.ordering = ordering
+                request = Request(factory.get('/api/products/', params))
+                return paginator.paginate_queryset(queryset, request)
+
+            def offset(params):
+                paginator = LimitOffsetPagination()
+                request = Request(factory.get('/api/products/', params))
+                return paginator.paginate_queryset(queryset.order_by(*ordering), request)
+
+            cases = [
+                ('cursor', 1, keyset, {'page_size': page_size}),
+                ('cursor', page, keyset, {'page_size': page_size, 'cursor': cursor}),
+                ('offset', 1, offset, {'limit': page_size}),
+                ('offset', page, offset, {'limit': page_size, 'offset': (page - 1) * page_size}),
+            ]
+            for name, number, paginate, params in cases:
+                median = median_ms(repeat, lambda: paginate(params))
+                self.stdout.write(f"{name:<7} ordering={label:<9} page={number:<6} median={median:.3f}ms")
+
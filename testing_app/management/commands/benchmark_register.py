@@ -0,0 +1,54 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client, override_settings
+from django.urls import reverse
+from testing_app.instrumentation import percentiles
+from ._benchmark import test_database
+
+
+class Command(BaseCommand):
+    help = "Load test POST /api/register/ at a given concurrency for one or more PBKDF2 work factors."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--iterations', type=int, nargs='+', default=[720000, 100000])
+
+    def handle(self, *args, **options):
+        with test_database():
+            for iterations in options['iterations']:
+                with override_settings(PASSWORD_HASH_ITERATIONS=iterations):
+                    self.run(iterations, options['requests'], options['concurrency'])
+
+    def run(self, iterations, requests, concurrency):
+        url = reverse('register')
+        usernames = count()
+
+        def register(_):
+            username = f'benchmark-{iterations}-{next(usernames)}'
+            start = time.perf_counter()
+            response = Client(SERVER_NAME='localhost').post(
+                url,
+                {'username': username, 'password': 'benchmark-password'},
+                content_type='application/json',
+            )
+            elapsed = (time.perf_counter() - start) * 1000
+            connections.close_all()
+            return response.status_code, elapsed
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(register, range(requests)))
+        wall = time.perf_counter() - start
+
+        errors = sum(1 for status_code, _ in results if status_code != 201)
+        latency = percentiles([elapsed for _, elapsed in results])
+        self.stdout.write(
+            f"iterations={iterations:<7} concurrency={concurrency} "
+            f"throughput={requests / wall:.1f}req/s "
+            + " ".join(f"{name}={value:.1f}ms" for name, value in latency.items())
+            + f" errors={errors}"
+        )
@@ -0,0 +1,52 @@
+import time
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+from testing_app.instrumentation import percentiles
+from testing_app.models import Product
+from testing_app.search import build_match_expression, search_products
+from testing_app.seeding import seed_catalog
+from ._benchmark import median_ms, test_database
+
+# Against the catalog of seed_catalog: one product, a prefix of 1% of the
+# product names, the products of one brand (the word "brand" is in every
+# document) and nothing.
+TERMS = ('0004242', '00421', 'Brand 00042', 'missing')
+
+
+class Command(BaseCommand):
+    help = "Compare name__icontains scans with the FTS5 index and time /api/products/search/."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--page-size', type=int, default=50)
+
+    def handle(self, *args, **options):
+        # Measure the search, not the response cache.
+        dummy_cache = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        with test_database(), override_settings(CACHES=dummy_cache, ALLOWED_HOSTS=['localhost']):
+            seed_catalog(options['products'])
+            client = Client(SERVER_NAME='localhost')
+            page_size = options['page_size']
+            for term in TERMS:
+                expression = build_match_expression(term)
+                icontains = median_ms(options['repeat'], lambda: list(
+                    Product.objects.filter(name__icontains=term).order_by('id')[:page_size]
+                ))
+                fts = median_ms(options['repeat'], lambda: list(
+                    search_products(Product.objects.all(), expression)
+                    .order_by('search_rank', 'id')[:page_size]
+                ))
+
+                timings = []
+                for _ in range(options['repeat']):
+                    start = time.perf_counter()
+                    response = client.get(reverse('product-search'), {'q': term, 'page_size': page_size})
+                    timings.append((time.perf_counter() - start) * 1000)
+                    assert response.status_code == 200, response.status_code
+                latency = percentiles(timings)
+                self.stdout.write(
+                    f"{term!r:<20} icontains={icontains:.2f}ms fts={fts:.2f}ms "
+                    + " ".join(f"api_{name}={value:.1f}ms" for name, value in latency.items())
+                )
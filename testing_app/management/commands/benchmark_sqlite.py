@@ -0,0 +1,101 @@
+import random
+import threading
+import time
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client, override_settings
+from django.urls import reverse
+from testing_app.instrumentation import percentiles
+from testing_app.models import Product
+from testing_app.seeding import seed_catalog
+from ._benchmark import test_database
+
+# SQLite's own defaults: rollback journal, full sync, 2MB page cache. The busy
+# timeout matches the 5s Python's sqlite3 module sets anyway.
+STOCK_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'delete',
+    'synchronous': 'full',
+    'cache_size': -2000,
+    'mmap_size': 0,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test a mix of GET /api/products/ and PATCH /api/products/<id>/ "
+        "with stock SQLite settings and with the tuned pragmas and persistent connections."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=2000)
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--write-percent', type=int, default=20)
+
+    def handle(self, *args, **options):
+        # Measure the database, not the response cache.
+        dummy_cache = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        with test_database(), override_settings(CACHES=dummy_cache):
+            seed_catalog(options['products'])
+            product_ids = list(Product.objects.values_list('pk', flat=True))
+            for label, pragmas, persistent in (
+                ('stock', STOCK_PRAGMAS, False),
+                ('tuned', {}, True),
+            ):
+                # Pragmas are applied as connections open.
+                connections.close_all()
+                with override_settings(SQLITE_PRAGMAS=pragmas):
+                    result = self.run(product_ids, persistent, options)
+                self.stdout.write(f"{label:<6} {result}")
+            connections.close_all()
+
+    def run(self, product_ids, persistent, options):
+        rng = random.Random(0)
+        jobs = [
+            rng.choice(product_ids) if rng.randrange(100) < options['write_percent'] else None
+            for _ in range(options['requests'])
+        ]
+        lock = threading.Lock()
+        reads, writes, errors = [], [], []
+
+        def worker():
+            client = Client(SERVER_NAME='localhost', raise_request_exception=False)
+            while True:
+                with lock:
+                    if not jobs:
+                        break
+                    product_id = jobs.pop()
+                start = time.perf_counter()
+                if product_id is None:
+                    response = client.get(reverse('product-list'))
+                    timings = reads
+                else:
+                    response = client.patch(
+                        reverse('product-detail', args=[product_id]),
+                        {'stock': rng.randrange(100)},
+                        content_type='application/json',
+                    )
+                    timings = writes
+                timings.append((time.perf_counter() - start) * 1000)
+                if response.status_code != 200:
+                    errors.append(response.status_code)
+                if not persistent:
+                    connections.close_all()
+            connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(options['concurrency'])]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - start
+
+        return (
+            f"throughput={options['requests'] / wall:.1f}req/s "
+            + " ".join(f"read_{name}={value:.1f}ms" for name, value in percentiles(reads).items())
+            + " "
+            + " ".join(f"write_{name}={value:.1f}ms" for name, value in percentiles(writes).items())
+            + f" errors={len(errors)}"
+        )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from testing_app.models import BrandStats, CategoryStats
+from testing_app.stats import check_rollups, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the brand and category rollups behind /api/stats/ from the "
+        "catalog and report every row that differs from the stored one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix', action='store_true', help="Rewrite the rollup tables from the catalog."
+        )
+
+    def handle(self, *args, **options):
+        inconsistent = 0
+        for stats_model in (BrandStats, CategoryStats):
+            label = stats_model._meta.pk.name
+            for pk, stored, expected in check_rollups(stats_model):
+                inconsistent += 1
+                self.stdout.write(f"{label} {pk}: stored {stored}, expected {expected}")
+            if options['fix']:
+                count = rebuild_rollups(stats_model)
+                self.stdout.write(f"Rebuilt {count} {label} rollups.")
+
+        if inconsistent and not options['fix']:
+            raise CommandError(f"{inconsistent} rollup rows are inconsistent; rerun with --fix.")
+        if not inconsistent:
+            self.stdout.write("Rollups are consistent.")
@@ -0,0 +1,41 @@
+import os
+import time
+from django.core.management.base import BaseCommand
+from testing_app.media import get_media_processing_setting, send_products_bulk_changed
+from testing_app.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Recover from media work lost with the in-process worker pool, e.g. on "
+        "a restart: mark products still waiting for their uploads as failed "
+        "and delete staged uploads older than --max-age. Run it while no web "
+        "process is serving, such as before starting them, since products "
+        "queued in a live pool look the same."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-age', type=int, default=3600,
+            help="Delete staged uploads at least this many seconds old.",
+        )
+
+    def handle(self, *args, **options):
+        stuck = Product.objects.filter(
+            media_status__in=[Product.MediaStatus.PENDING, Product.MediaStatus.PROCESSING]
+        )
+        product_ids = list(stuck.values_list('pk', flat=True))
+        if product_ids:
+            Product.objects.filter(pk__in=product_ids).update(media_status=Product.MediaStatus.FAILED)
+            send_products_bulk_changed(product_ids)
+        self.stdout.write(f"Marked the media of {len(product_ids)} products as failed.")
+
+        directory = get_media_processing_setting('STAGING_DIR')
+        cutoff = time.time() - options['max_age']
+        deleted = 0
+        if os.path.isdir(directory):
+            for entry in os.scandir(directory):
+                if entry.is_file() and entry.stat().st_mtime <= cutoff:
+                    os.remove(entry.path)
+                    deleted += 1
+        self.stdout.write(f"Deleted {deleted} staged uploads.")
@@ -0,0 +1,42 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from testing_app.models import Brand, Category, Product
+from testing_app.seeding import clear_catalog, seed_catalog
+
+
+class Command(BaseCommand):
+    help = "Bulk seed a deterministic catalog of products, brands and categories."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=10000)
+        parser.add_argument('--brands', type=int, default=100)
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--categories-per-product', type=int, default=2)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument(
+            '--clear', action='store_true',
+            help="Delete the existing catalog first.",
+        )
+
+    def handle(self, *args, **options):
+        if options['brands'] < 1 or options['categories'] < 1:
+            raise CommandError("At least one brand and one category are needed.")
+        if options['clear']:
+            clear_catalog()
+        elif Product.objects.exists() or Brand.objects.exists() or Category.objects.exists():
+            raise CommandError("The catalog is not empty; pass --clear to replace it.")
+
+        start = time.perf_counter()
+        created = seed_catalog(
+            options['products'],
+            brands=options['brands'],
+            categories=options['categories'],
+            categories_per_product=options['categories_per_product'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(
+            f"Seeded {created} products, {options['brands']} brands and "
+            f"{options['categories']} categories in {time.perf_counter() - start:.1f}s."
+        )
@@ -0,0 +1,324 @@
+import io
+import logging
+import os
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.utils.encoding import filepath_to_uri
+from django.db import connections, transaction
+from PIL import Image
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+MEDIA_PROCESSING_DEFAULTS = {
+    # 0 processes uploads inline, once the request's transaction commits.
+    'WORKERS': 2,
+    'STAGING_DIR': os.path.join(tempfile.gettempdir(), 'product-uploads'),
+}
+
+
+PRODUCT_IMAGE_RENDITIONS_DEFAULTS = {
+    'WIDTHS': [160, 320, 640, 1280],
+    'FORMAT': 'WEBP',
+    'QUALITY': 80,
+    'DIRECTORY': 'products/renditions',
+}
+
+
+def get_media_processing_setting(name):
+    return getattr(settings, 'MEDIA_PROCESSING', {}).get(name, MEDIA_PROCESSING_DEFAULTS[name])
+
+
+def get_rendition_setting(name):
+    return getattr(settings, 'PRODUCT_IMAGE_RENDITIONS', {}).get(
+        name, PRODUCT_IMAGE_RENDITIONS_DEFAULTS[name]
+    )
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=get_media_processing_setting('WORKERS'),
+                thread_name_prefix='product-media',
+            )
+        return _executor
+
+
+def shutdown_executor():
+    """
+    Wait for the queued media tasks to finish and drop the worker pool; the
+    next task starts a new one.
+    """
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+class StagedUpload:
+    """
+    An upload moved out of the request into the staging directory, waiting
+    for the worker to verify it and write it to storage under `name`.
+    """
+
+    def __init__(self, path, name):
+        self.path = path
+        self.name = name
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def stage_upload(upload):
+    """
+    Move an uploaded file to the staging directory.
+
+    Uploads are streamed to a temporary file in chunks (FILE_UPLOAD_HANDLERS),
+    so this is normally a rename. Otherwise the upload is copied chunk by
+    chunk.
+    """
+    directory = get_media_processing_setting('STAGING_DIR')
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, uuid.uuid4().hex)
+    try:
+        os.replace(upload.temporary_file_path(), path)
+    except (AttributeError, OSError):
+        upload.seek(0)
+        with open(path, 'wb') as staged:
+            for chunk in upload.chunks():
+                staged.write(chunk)
+    return StagedUpload(path, os.path.basename(upload.name))
+
+
+def schedule_media_processing(product_id, uploads):
+    """
+    Stage `uploads` (a mapping of field name to uploaded file) and hand them
+    to the worker pool once the current transaction commits.
+
+    Staging happens right away because the request closes its uploads when
+    it finishes, which may be before the commit.
+    """
+    staged = {name: stage_upload(upload) for name, upload in uploads.items()}
+    transaction.on_commit(lambda: submit_media_processing(product_id, staged))
+
+
+def submit_media_processing(product_id, uploads):
+    submit_media_task(process_product_media, product_id, uploads)
+
+
+def submit_media_task(task, product_id, *args):
+    if get_media_processing_setting('WORKERS'):
+        get_executor().submit(run_media_worker, task, product_id, *args)
+    else:
+        task(product_id, *args)
+
+
+def run_media_worker(task, product_id, *args):
+    try:
+        task(product_id, *args)
+    except Exception:
+        logger.exception("Processing media of product %s failed", product_id)
+    finally:
+        # Worker threads are not request threads, so nothing else closes
+        # their connections.
+        connections.close_all()
+
+
+def send_products_bulk_changed(product_ids):
+    # testing_app.signals imports this module to connect its receivers.
+    from .signals import products_bulk_changed
+    products_bulk_changed.send(sender=Product, product_ids=product_ids)
+
+
+def verify_image(path):
+    with Image.open(path) as image:
+        image.verify()
+
+
+def process_product_media(product_id, uploads):
+    """
+    Verify and store the staged uploads of a product, render the renditions
+    of a new image and record the outcome in `media_status`.
+    """
+    try:
+        product = Product.objects.get(pk=product_id)
+    except Product.DoesNotExist:
+        for staged in uploads.values():
+            staged.discard()
+        return
+
+    Product.objects.filter(pk=product_id).update(media_status=Product.MediaStatus.PROCESSING)
+    changes = {}
+    stale_renditions = {}
+    try:
+        if 'image' in uploads:
+            verify_image(uploads['image'].path)
+        for name, staged in uploads.items():
+            field_file = getattr(product, name)
+            with open(staged.path, 'rb') as content:
+                field_file.save(staged.name, File(content), save=False)
+            changes[name] = field_file.name
+        if 'image' in changes:
+            changes['image_renditions'] = generate_renditions(product.image)
+            stale_renditions = product.image_renditions
+        changes['media_status'] = Product.MediaStatus.READY
+    except Exception:
+        logger.exception("Rejected media uploaded for product %s", product_id)
+        delete_renditions(product.image.storage, changes.pop('image_renditions', {}))
+        stale_renditions = {}
+        for name in list(changes):
+            getattr(product, name).storage.delete(changes.pop(name))
+        changes['media_status'] = Product.MediaStatus.FAILED
+    finally:
+        for staged in uploads.values():
+            staged.discard()
+
+    # update() skips post_save, so invalidate cached responses explicitly.
+    Product.objects.filter(pk=product_id).update(**changes)
+    delete_renditions(product.image.storage, stale_renditions)
+    send_products_bulk_changed([product_id])
+
+
+def get_rendition_name(image_name, width):
+    # The whole stored name, extension included, is what is unique, e.g.
+    # products/a.png -> products/renditions/products/a.png-160w.webp.
+    extension = get_rendition_setting('FORMAT').lower()
+    return f"{get_rendition_setting('DIRECTORY')}/{image_name}-{width}w.{extension}"
+
+
+def generate_renditions(field_file):
+    """
+    Write a downscaled copy of the image for every configured width smaller
+    than the original and return the `image_renditions` value describing
+    them: the source image name and a mapping of width to stored name.
+    """
+    renditions = {'source': field_file.name, 'widths': {}}
+    storage = field_file.storage
+    with storage.open(field_file.name) as content, Image.open(content) as image:
+        image.load()
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+        for width in sorted(get_rendition_setting('WIDTHS')):
+            if width >= image.width:
+                break
+            rendition = image.copy()
+            rendition.thumbnail((width, image.height))
+            buffer = io.BytesIO()
+            rendition.save(
+                buffer, get_rendition_setting('FORMAT'), quality=get_rendition_setting('QUALITY')
+            )
+            name = get_rendition_name(field_file.name, width)
+            renditions['widths'][str(width)] = storage.save(name, ContentFile(buffer.getvalue()))
+    return renditions
+
+
+def delete_renditions(storage, renditions):
+    """
+    Delete the files of an `image_renditions` value.
+    """
+    for name in (renditions or {}).get('widths', {}).values():
+        storage.delete(name)
+
+
+def schedule_rendition_deletion(product):
+    """
+    Delete the renditions of a deleted product once the deletion commits.
+    """
+    if product.image_renditions:
+        storage = product.image.storage
+        renditions = product.image_renditions
+        transaction.on_commit(lambda: delete_renditions(storage, renditions))
+
+
+def renditions_are_current(product):
+    if not product.image:
+        return not product.image_renditions
+    return product.image_renditions.get('source') == product.image.name
+
+
+def schedule_rendition_updates(products):
+    """
+    Regenerate, in the worker pool, the renditions of every product whose
+    image changed since they were last rendered.
+    """
+    for product in products:
+        if not renditions_are_current(product):
+            transaction.on_commit(
+                lambda product_id=product.pk: submit_media_task(update_renditions, product_id)
+            )
+
+
+def update_renditions(product_id):
+    try:
+        product = Product.objects.only('image', 'image_renditions').get(pk=product_id)
+    except Product.DoesNotExist:
+        return
+    if renditions_are_current(product):
+        return
+    try:
+        renditions = generate_renditions(product.image) if product.image else {}
+    except Exception:
+        logger.exception("Rendering the image of product %s failed", product_id)
+        renditions = {'source': product.image.name, 'widths': {}}
+    # Only store them if the image did not change again in the meantime,
+    # and delete whichever set of renditions is no longer referenced.
+    updated = Product.objects.filter(pk=product_id, image=product.image.name).update(
+        image_renditions=renditions
+    )
+    delete_renditions(product.image.storage, product.image_renditions if updated else renditions)
+    send_products_bulk_changed([product_id])
+
+
+class MediaURLBuilder:
+    """
+    Builds media URLs for every row of one response.
+
+    With `MEDIA_CDN_URL` set, names are appended to it. Otherwise the URL
+    prefix of each file system storage (made absolute for `request` when
+    DEBUG is on) is resolved once and reused, which gives the same URLs as
+    `storage.url()` plus `request.build_absolute_uri()` without repeating
+    them per row. Other storages still go through `storage.url()`.
+    """
+
+    def __init__(self, request=None):
+        self.request = request if settings.DEBUG else None
+        self.cdn_url = getattr(settings, 'MEDIA_CDN_URL', None)
+        self.prefixes = {}
+
+    def get_prefix(self, storage):
+        if self.cdn_url:
+            return self.cdn_url.rstrip('/') + '/'
+        if not isinstance(storage, FileSystemStorage):
+            return None
+        prefix = storage.base_url
+        if self.request is not None:
+            prefix = self.request.build_absolute_uri(prefix or '/')
+        return prefix
+
+    def url(self, name, storage):
+        if not name:
+            return None
+        key = id(storage)
+        if key not in self.prefixes:
+            self.prefixes[key] = self.get_prefix(storage)
+        prefix = self.prefixes[key]
+        if prefix is not None:
+            return prefix + filepath_to_uri(name).lstrip('/')
+        url = storage.url(name)
+        return self.request.build_absolute_uri(url) if self.request is not None else url
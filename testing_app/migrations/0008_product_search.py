@@ -0,0 +1,51 @@
+# Generated by Django 5.0.6 on 2026-10-18 15:38
+
+import django.db.models.deletion
+import testing_app.models
+from django.db import migrations, models
+
+CREATE_INDEX = '''
+CREATE VIRTUAL TABLE testing_app_product_search USING fts5(
+    name, brand_name, category_names, tokenize = 'unicode61 remove_diacritics 2'
+)
+'''
+
+POPULATE_INDEX = '''
+INSERT INTO testing_app_product_search (rowid, name, brand_name, category_names)
+SELECT product.id, product.name, brand.name, COALESCE((
+    SELECT group_concat(category.name, ' ')
+    FROM testing_app_product_category AS link
+    INNER JOIN testing_app_category AS category ON category.id = link.category_id
+    WHERE link.product_id = product.id
+), '')
+FROM testing_app_product AS product
+INNER JOIN testing_app_brand AS brand ON brand.id = product.brand_id
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testing_app', '0007_product_image_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSearchDocument',
+            fields=[
+                ('product', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_document', serialize=False, to='testing_app.product')),
+                ('name', models.TextField()),
+                ('brand_name', models.TextField()),
+                ('category_names', models.TextField()),
+                ('document', testing_app.models.SearchDocumentField(db_column='testing_app_product_search')),
+            ],
+            options={
+                'db_table': 'testing_app_product_search',
+                'managed': False,
+            },
+        ),
+        migrations.RunSQL(
+            [CREATE_INDEX, POPULATE_INDEX],
+            'DROP TABLE testing_app_product_search',
+        ),
+    ]
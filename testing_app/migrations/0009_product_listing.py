@@ -0,0 +1,68 @@
+# Generated by Django 5.0.6 on 2026-10-18 15:42
+
+from django.db import migrations, models
+
+# The `listing` value of the product row being updated.
+LISTING = '''json_object(
+    'brand', (
+        SELECT json_object('id', brand.id, 'name', brand.name)
+        FROM testing_app_brand AS brand
+        WHERE brand.id = testing_app_product.brand_id
+    ),
+    'category', (
+        SELECT json_group_array(json(category))
+        FROM (
+            SELECT json_object('id', category.id, 'name', category.name) AS category
+            FROM testing_app_product_category AS link
+            INNER JOIN testing_app_category AS category ON category.id = link.category_id
+            WHERE link.product_id = testing_app_product.id
+            ORDER BY category.id
+        )
+    )
+)'''
+
+
+def refresh(where):
+    return f'UPDATE testing_app_product SET listing = {LISTING} WHERE {where};'
+
+
+# (name, event, statements). Writing `listing` itself refreshes it as well,
+# so saving an instance with a stale value in memory cannot store it.
+TRIGGERS = [
+    ('product_listing_insert', 'AFTER INSERT ON testing_app_product',
+     [refresh('id = NEW.id')]),
+    ('product_listing_update', 'AFTER UPDATE OF brand_id, listing ON testing_app_product',
+     [refresh('id = NEW.id')]),
+    ('brand_listing_update', 'AFTER UPDATE OF name ON testing_app_brand',
+     [refresh('brand_id = NEW.id')]),
+    ('category_listing_update', 'AFTER UPDATE OF name ON testing_app_category',
+     [refresh('id IN (SELECT product_id FROM testing_app_product_category WHERE category_id = NEW.id)')]),
+    ('product_category_listing_insert', 'AFTER INSERT ON testing_app_product_category',
+     [refresh('id = NEW.product_id')]),
+    ('product_category_listing_delete', 'AFTER DELETE ON testing_app_product_category',
+     [refresh('id = OLD.product_id')]),
+    ('product_category_listing_update', 'AFTER UPDATE ON testing_app_product_category',
+     [refresh('id IN (OLD.product_id, NEW.product_id)')]),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testing_app', '0008_product_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='listing',
+            field=models.JSONField(default=dict, editable=False),
+        ),
+        migrations.RunSQL(
+            [
+                f'CREATE TRIGGER {name} {event} BEGIN {" ".join(statements)} END'
+                for name, event, statements in TRIGGERS
+            ] + [refresh('1')],
+            [f'DROP TRIGGER {name}' for name, _, _ in TRIGGERS],
+        ),
+    ]
@@ -0,0 +1,146 @@
+# Generated by Django 5.0.6 on 2026-10-18 15:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Aggregates of the products in each group; inventory value is summed in
+# cents so the totals are exact.
+POPULATE = {
+    'testing_app_brandstats': '''
+        SELECT brand.id, COUNT(product.id), COALESCE(SUM(product.stock), 0),
+            COALESCE(SUM(CAST(ROUND(product.price * 100) AS INTEGER) * product.stock), 0) / 100.0
+        FROM testing_app_brand AS brand
+        LEFT JOIN testing_app_product AS product ON product.brand_id = brand.id
+        GROUP BY brand.id
+    ''',
+    'testing_app_categorystats': '''
+        SELECT category.id, COUNT(product.id), COALESCE(SUM(product.stock), 0),
+            COALESCE(SUM(CAST(ROUND(product.price * 100) AS INTEGER) * product.stock), 0) / 100.0
+        FROM testing_app_category AS category
+        LEFT JOIN testing_app_product_category AS link ON link.category_id = category.id
+        LEFT JOIN testing_app_product AS product ON product.id = link.product_id
+        GROUP BY category.id
+    ''',
+}
+
+COLUMNS = {
+    'testing_app_brandstats': 'brand_id',
+    'testing_app_categorystats': 'category_id',
+}
+
+
+def populate(table):
+    return (
+        f'INSERT INTO {table} ({COLUMNS[table]}, product_count, total_stock, inventory_value) '
+        f'{POPULATE[table]};'
+    )
+
+
+def change(table, sign, product, where, source=''):
+    """
+    Add (sign '+') or remove (sign '-') the product row `product` to the
+    rollup rows of `table` matched by `where`. `source` is an optional
+    FROM clause providing `product`. The inventory value is added in integer
+    cents, as in POPULATE, so it never drifts from a recomputed total.
+    """
+    return f'''UPDATE {table} SET
+        product_count = product_count {sign} 1,
+        total_stock = total_stock {sign} {product}.stock,
+        inventory_value = (
+            CAST(ROUND(inventory_value * 100) AS INTEGER)
+            {sign} CAST(ROUND({product}.price * 100) AS INTEGER) * {product}.stock
+        ) / 100.0
+        {source} WHERE {where};'''
+
+
+def brand_change(sign, product):
+    return change('testing_app_brandstats', sign, product, f'brand_id = {product}.brand_id')
+
+
+def categories_change(sign, product):
+    return change(
+        'testing_app_categorystats', sign, product,
+        f'category_id IN (SELECT category_id FROM testing_app_product_category '
+        f'WHERE product_id = {product}.id)',
+    )
+
+
+def link_change(sign, link):
+    # Links of a product that no longer exists were already removed with it.
+    return change(
+        'testing_app_categorystats', sign, 'product',
+        f'product.id = {link}.product_id AND category_id = {link}.category_id',
+        source='FROM testing_app_product AS product',
+    )
+
+
+# (name, event, statements), as in migration 0009. Deleting a product
+# removes it from the categories it still links to, and deleting a link
+# removes its product if that still exists, so either order counts once.
+TRIGGERS = [
+    ('brand_stats_insert', 'AFTER INSERT ON testing_app_brand',
+     ['INSERT INTO testing_app_brandstats (brand_id, product_count, total_stock, inventory_value) '
+      'VALUES (NEW.id, 0, 0, 0);']),
+    ('brand_stats_delete', 'AFTER DELETE ON testing_app_brand',
+     ['DELETE FROM testing_app_brandstats WHERE brand_id = OLD.id;']),
+    ('category_stats_insert', 'AFTER INSERT ON testing_app_category',
+     ['INSERT INTO testing_app_categorystats (category_id, product_count, total_stock, inventory_value) '
+      'VALUES (NEW.id, 0, 0, 0);']),
+    ('category_stats_delete', 'AFTER DELETE ON testing_app_category',
+     ['DELETE FROM testing_app_categorystats WHERE category_id = OLD.id;']),
+    ('product_stats_insert', 'AFTER INSERT ON testing_app_product',
+     [brand_change('+', 'NEW'), categories_change('+', 'NEW')]),
+    ('product_stats_update', 'AFTER UPDATE OF brand_id, price, stock ON testing_app_product',
+     [brand_change('-', 'OLD'), brand_change('+', 'NEW'),
+      categories_change('-', 'OLD'), categories_change('+', 'NEW')]),
+    ('product_stats_delete', 'AFTER DELETE ON testing_app_product',
+     [brand_change('-', 'OLD'), categories_change('-', 'OLD')]),
+    ('product_category_stats_insert', 'AFTER INSERT ON testing_app_product_category',
+     [link_change('+', 'NEW')]),
+    ('product_category_stats_delete', 'AFTER DELETE ON testing_app_product_category',
+     [link_change('-', 'OLD')]),
+    ('product_category_stats_update', 'AFTER UPDATE ON testing_app_product_category',
+     [link_change('-', 'OLD'), link_change('+', 'NEW')]),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testing_app', '0009_product_listing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BrandStats',
+            fields=[
+                ('product_count', models.PositiveIntegerField(default=0)),
+                ('total_stock', models.PositiveBigIntegerField(default=0)),
+                ('inventory_value', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('brand', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='stats', serialize=False, to='testing_app.brand')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='CategoryStats',
+            fields=[
+                ('product_count', models.PositiveIntegerField(default=0)),
+                ('total_stock', models.PositiveBigIntegerField(default=0)),
+                ('inventory_value', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('category', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='stats', serialize=False, to='testing_app.category')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.RunSQL(
+            [
+                f'CREATE TRIGGER {name} {event} BEGIN {" ".join(statements)} END'
+                for name, event, statements in TRIGGERS
+            ] + [populate(table) for table in POPULATE],
+            [f'DROP TRIGGER {name}' for name, _, _ in TRIGGERS],
+        ),
+    ]
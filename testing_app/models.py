@@ -10,7 +10,23 @@ class Brand(models.Model):
     def __str__(self):
         return self.name
 
+class ProductQuerySet(models.QuerySet):
+    def with_total_price(self):
+        return self.annotate(
+            total_price=models.ExpressionWrapper(
+                models.F('price') * models.F('stock'),
+                output_field=models.DecimalField(max_digits=20, decimal_places=2),
+            )
+        )
+
+
 class Product(models.Model):
+    class MediaStatus(models.TextChoices):
+        PENDING = 'pending'
+        PROCESSING = 'processing'
+        READY = 'ready'
+        FAILED = 'failed'
+
     name = models.CharField(max_length=100, unique=True)
     brand = models.ForeignKey(Brand, on_delete=models.CASCADE)
     category = models.ManyToManyField(Category)
@@ -18,6 +34,42 @@ class Product(models.Model):
     price = models.DecimalField(max_digits=9, decimal_places=2)
     file = models.FileField(upload_to='files/')
     stock = models.PositiveIntegerField()
+    # Downscaled copies of `image` made by testing_app.media: the image they
+    # were rendered from under "source" and stored names by width under
+    # "widths".
+    image_renditions = models.JSONField(default=dict, blank=True)
+    # State of the uploads being processed by testing_app.media.
+    media_status = models.CharField(
+        max_length=10, choices=MediaStatus.choices, default=MediaStatus.READY
+    )
+    # Denormalized brand and categories for single-table list reads:
+    # {"brand": {"id", "name"}, "category": [{"id", "name"}, ...]}, with the
+    # categories in id order. Kept up to date by database triggers (migration
+    # 0009) in the same statement as the write.
+    listing = models.JSONField(default=dict, editable=False)
+
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Backs keyset pagination on ?ordering=price / -price and
+            # ?min_price= / ?max_price= range filters.
+            models.Index(fields=['price', 'id'], name='product_price_id_idx'),
+            # Partial indexes for ?in_stock=true (stock > 0, as is_in_stock()),
+            # in id order and in price order.
+            models.Index(
+                fields=['id'],
+                condition=models.Q(stock__gt=0),
+                name='product_in_stock_idx',
+            ),
+            models.Index(
+                fields=['price', 'id'],
+                condition=models.Q(stock__gt=0),
+                name='product_in_stock_price_idx',
+            ),
+            # ?brand= combined with a price range or price ordering.
+            models.Index(fields=['brand', 'price', 'id'], name='product_brand_price_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -33,3 +85,80 @@ class Product(models.Model):
         if self.price < 0:
             raise ValueError("Price cannot be negative")
         super().save(*args, **kwargs)
+
+
+class SearchDocumentField(models.TextField):
+    """
+    The hidden column of an FTS5 table. It is named after the table and
+    matches a query against all of the table's columns.
+    """
+
+
+@SearchDocumentField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+class ProductSearchDocument(models.Model):
+    """
+    A row of the SQLite FTS5 index over products, keyed by product id. The
+    virtual table is created by a migration rather than by Django, and
+    testing_app.search keeps it in sync.
+    """
+    product = models.OneToOneField(
+        Product,
+        primary_key=True,
+        db_column='rowid',
+        on_delete=models.DO_NOTHING,
+        related_name='search_document',
+    )
+    name = models.TextField()
+    brand_name = models.TextField()
+    category_names = models.TextField()
+    document = SearchDocumentField(db_column='testing_app_product_search')
+
+    class Meta:
+        managed = False
+        db_table = 'testing_app_product_search'
+
+
+class CatalogStats(models.Model):
+    """
+    Running totals of the products in one group. Kept up to date by
+    database triggers (migration 0010) in the same statement as the write;
+    testing_app.stats recomputes them from scratch.
+    """
+    product_count = models.PositiveIntegerField(default=0)
+    total_stock = models.PositiveBigIntegerField(default=0)
+    # Sum of price * stock, as Product.total_price.
+    inventory_value = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+
+    class Meta:
+        abstract = True
+
+
+class BrandStats(CatalogStats):
+    # The triggers add and remove the row with its brand, so Django neither
+    # cascades to it nor constrains it.
+    brand = models.OneToOneField(
+        Brand,
+        primary_key=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='stats',
+    )
+
+
+class CategoryStats(CatalogStats):
+    category = models.OneToOneField(
+        Category,
+        primary_key=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='stats',
+    )
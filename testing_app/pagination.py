@@ -0,0 +1,161 @@
+import json
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor pagination keyed on the whole ordering tuple, e.g. (price, id).
+
+    DRF's CursorPagination only filters on the first ordering field and falls
+    back to an OFFSET for duplicates. Here the ordering always ends on the
+    unique `id` column, so the cursor holds every ordering value and each page
+    is a single indexed range scan, however deep it is.
+    """
+    ordering = ('id',)
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    tiebreaker = 'id'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering[-1].lstrip('-') != self.tiebreaker:
+            # Keep the tiebreaker in the same direction as the leading field
+            # so a composite index can be scanned in a single direction.
+            prefix = '-' if ordering[0].startswith('-') else ''
+            ordering = tuple(ordering) + (prefix + self.tiebreaker,)
+        return ordering
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            field_name = field.lstrip('-')
+            if isinstance(instance, dict):
+                attr = instance[field_name]
+            else:
+                attr = getattr(instance, field_name)
+            values.append(str(attr))
+        return json.dumps(values)
+
+    def get_ordering_field(self, queryset, field_name):
+        annotation = queryset.query.annotations.get(field_name)
+        if annotation is not None:
+            return annotation.output_field
+        return queryset.model._meta.get_field(field_name)
+
+    def get_keyset_filter(self, position, reverse, queryset):
+        try:
+            values = json.loads(position)
+        except ValueError:
+            values = None
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            return None
+        # Cursors come from the client, so a well-formed one can still carry
+        # values the columns cannot hold.
+        try:
+            values = [
+                self.get_ordering_field(queryset, field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            return None
+
+        query = Q()
+        lookups = []
+        for index, field in enumerate(self.ordering):
+            field_name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') != reverse else 'gt'
+            lookups.append(lookup)
+            equal = {
+                name.lstrip('-'): value
+                for name, value in zip(self.ordering[:index], values)
+            }
+            query |= Q(**equal, **{f'{field_name}__{lookup}': values[index]})
+
+        # The inclusive bound on the leading column lets the database start an
+        # index range scan at the cursor instead of filtering the OR per row.
+        leading = self.ordering[0].lstrip('-')
+        return Q(**{f'{leading}__{lookups[0]}e': values[0]}) & query
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async counterpart of `paginate_queryset`, fetching the page with the
+        async ORM.
+        """
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page([obj async for obj in queryset.aiterator()])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """
+        Return the (unevaluated) queryset for the requested page plus one row
+        used to detect whether a following page exists.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (self.reverse, self.current_position) = (False, None)
+        else:
+            (_, self.reverse, self.current_position) = self.cursor
+
+        if self.reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if self.current_position is not None:
+            keyset_filter = self.get_keyset_filter(self.current_position, self.reverse, queryset)
+            if keyset_filter is None:
+                raise NotFound(self.invalid_cursor_message)
+            queryset = queryset.filter(keyset_filter)
+
+        # Positions are unique, so the offset part of the cursor is never used.
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        current_position = self.current_position
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if self.reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
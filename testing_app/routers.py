@@ -0,0 +1,111 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+READ_REPLICA_DEFAULTS = {
+    'ALIAS': 'replica',
+    'STICKY_SECONDS': 5,
+    'COOKIE_NAME': 'primary_pinned',
+}
+
+
+def get_read_replica_setting(name):
+    return getattr(settings, 'READ_REPLICA', {}).get(name, READ_REPLICA_DEFAULTS[name])
+
+
+def get_replica_alias():
+    """
+    Return the replica alias, or None when it is not configured in DATABASES.
+    """
+    alias = get_read_replica_setting('ALIAS')
+    return alias if alias in connections.settings else None
+
+
+class RoutingState:
+    """
+    Routing decisions for the request being handled: `use_replica` is set
+    once the request is known to be safe to serve from the replica, and
+    `pinned` as soon as anything is written.
+    """
+
+    def __init__(self):
+        self.use_replica = False
+        self.pinned = False
+
+    @property
+    def reads_from_replica(self):
+        return self.use_replica and not self.pinned and get_replica_alias() is not None
+
+
+_routing_state = ContextVar('replica_routing_state', default=None)
+
+
+@contextmanager
+def replica_routing(state=None):
+    """
+    Route reads for the duration of the block according to `state`, or a
+    fresh RoutingState, which is yielded. Outside any block every query goes
+    to the primary.
+    """
+    if state is None:
+        state = RoutingState()
+    token = _routing_state.set(state)
+    try:
+        yield state
+    finally:
+        _routing_state.reset(token)
+
+
+def get_pin_cache_key(user):
+    return f'replica:pinned:{user.pk}'
+
+
+def is_pinned_to_primary(request):
+    """
+    Whether this client wrote recently enough that the replica may not have
+    caught up. Tracked per user for token-authenticated clients and with a
+    cookie for everyone else.
+    """
+    if get_read_replica_setting('COOKIE_NAME') in request.COOKIES:
+        return True
+    user = getattr(request, 'user', None)
+    return bool(user and user.is_authenticated and cache.get(get_pin_cache_key(user)))
+
+
+def pin_to_primary(request, response):
+    seconds = get_read_replica_setting('STICKY_SECONDS')
+    response.set_cookie(
+        get_read_replica_setting('COOKIE_NAME'), '1', max_age=seconds, httponly=True
+    )
+    user = getattr(request, 'user', None)
+    if user and user.is_authenticated:
+        cache.set(get_pin_cache_key(user), True, seconds)
+
+
+class ReplicaRouter:
+    """
+    Sends reads to the replica while a `replica_routing()` block allows it,
+    and everything else to the primary. The first write in a block pins the
+    rest of it to the primary so it reads its own writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if state is None or not state.reads_from_replica:
+            return None
+        return get_replica_alias()
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            state.pinned = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        databases = {DEFAULT_DB_ALIAS, get_replica_alias()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
@@ -0,0 +1,112 @@
+import re
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, FloatField, Func, Value
+from .models import Brand, Category, Product, ProductSearchDocument
+
+PRODUCT_SEARCH_DEFAULTS = {
+    # bm25 weights of the name, brand_name and category_names columns.
+    'WEIGHTS': (10.0, 5.0, 2.0),
+}
+
+# Product ids per INSERT ... SELECT when reindexing.
+INDEX_BATCH_SIZE = 500
+
+_word = re.compile(r'\w+')
+
+
+def get_product_search_setting(name):
+    return getattr(settings, 'PRODUCT_SEARCH', {}).get(name, PRODUCT_SEARCH_DEFAULTS[name])
+
+
+class BM25(Func):
+    """
+    Relevance of the current row of an FTS5 query. Lower is better.
+    """
+    function = 'bm25'
+    output_field = FloatField()
+
+
+def build_match_expression(text):
+    """
+    Turn free text into an FTS5 query where every word must match the start
+    of a token, e.g. `red sho` -> `"red"* "sho"*`. Return None when the
+    text has no words.
+
+    Only word characters are kept, so the FTS5 query syntax cannot be used
+    to inject operators or produce a syntax error.
+    """
+    words = _word.findall(text)
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_products(queryset, expression):
+    """
+    Restrict `queryset` to products matching the FTS5 `expression` and
+    annotate them with their `search_rank`.
+    """
+    return queryset.filter(search_document__document__match=expression).annotate(
+        search_rank=BM25(
+            F('search_document__document'),
+            *(Value(weight) for weight in get_product_search_setting('WEIGHTS')),
+        )
+    )
+
+
+def get_table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def get_index_sql(where=''):
+    """
+    INSERT ... SELECT building the search document of the products matched
+    by `where`: their name, brand name and space-separated category names.
+    """
+    return f'''
+        INSERT INTO {get_table(ProductSearchDocument)} (rowid, name, brand_name, category_names)
+        SELECT product.id, product.name, brand.name, COALESCE((
+            SELECT group_concat(category.name, ' ')
+            FROM {get_table(Product.category.through)} AS link
+            INNER JOIN {get_table(Category)} AS category ON category.id = link.category_id
+            WHERE link.product_id = product.id
+        ), '')
+        FROM {get_table(Product)} AS product
+        INNER JOIN {get_table(Brand)} AS brand ON brand.id = product.brand_id
+        {where}
+    '''
+
+
+def index_products(product_ids):
+    """
+    Replace the search documents of the given products with their current
+    name, brand and categories. Ids of deleted products are dropped.
+    """
+    product_ids = list(product_ids)
+    with connection.cursor() as cursor:
+        for start in range(0, len(product_ids), INDEX_BATCH_SIZE):
+            batch = product_ids[start:start + INDEX_BATCH_SIZE]
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(
+                f'DELETE FROM {get_table(ProductSearchDocument)} WHERE rowid IN ({placeholders})',
+                batch,
+            )
+            cursor.execute(get_index_sql(f'WHERE product.id IN ({placeholders})'), batch)
+
+
+def rebuild_index():
+    """
+    Rebuild the whole index from the catalog and return the number of
+    indexed products.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {get_table(ProductSearchDocument)}')
+        cursor.execute(get_index_sql())
+        count = cursor.rowcount
+        # Merge the b-trees written by the bulk insert.
+        cursor.execute(
+            f"INSERT INTO {get_table(ProductSearchDocument)} "
+            f"({get_table(ProductSearchDocument)}) VALUES ('optimize')"
+        )
+    return count
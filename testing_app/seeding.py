@@ -0,0 +1,82 @@
+from itertools import islice
+from django.db import connection, transaction
+import factory.random
+from .cache import bump_response_cache_version
+from .factories import BrandFactory, CategoryFactory, ProductFactory
+from .models import Brand, Category, Product, ProductSearchDocument
+from .search import rebuild_index
+
+# Products point at these names; the files themselves are not created.
+# Seeded products are marked as rendered (with no renditions) so that a later
+# write does not queue rendition work for an image that does not exist.
+SEED_IMAGE = 'products/seed.png'
+SEED_FILE = 'files/seed.pdf'
+SEED_RENDITIONS = {'source': SEED_IMAGE, 'widths': {}}
+
+
+def seed_catalog(products, brands=100, categories=50, categories_per_product=2,
+                 seed=0, batch_size=2000):
+    """
+    Bulk insert a catalog generated by the factories.
+
+    The same arguments always produce the same rows: Faker and the factory
+    random generator are reseeded, names are numbered, and every product
+    draws `categories_per_product` categories from one shared pool instead
+    of creating its own. Returns the number of products created.
+    """
+    factory.random.reseed_random(seed)
+    rng = factory.random.randgen
+
+    with transaction.atomic():
+        brand_rows = Brand.objects.bulk_create(
+            [BrandFactory.build(name=f'Brand {i:05d}') for i in range(brands)],
+            batch_size=batch_size,
+        )
+        category_ids = [
+            category.pk for category in Category.objects.bulk_create(
+                [CategoryFactory.build(name=f'Category {i:05d}') for i in range(categories)],
+                batch_size=batch_size,
+            )
+        ]
+        per_product = min(categories_per_product, len(category_ids))
+        through = Product.category.through
+
+        rows = (
+            ProductFactory.build(
+                name=f'Product {i:07d}',
+                brand=brand_rows[i % brands],
+                image=SEED_IMAGE,
+                image_renditions=SEED_RENDITIONS,
+                file=SEED_FILE,
+            )
+            for i in range(products)
+        )
+        created = 0
+        while batch := list(islice(rows, batch_size)):
+            Product.objects.bulk_create(batch)
+            through.objects.bulk_create([
+                through(product_id=product.pk, category_id=category_id)
+                for product in batch
+                for category_id in rng.sample(category_ids, per_product)
+            ])
+            created += len(batch)
+
+    # Bulk inserts send no signals.
+    rebuild_index()
+    for label in ('brand', 'category', 'product'):
+        bump_response_cache_version(label)
+    return created
+
+
+def clear_catalog():
+    """
+    Delete every product, brand and category, and the search index, with
+    plain DELETE statements, skipping the per-row collection and signals of
+    QuerySet.delete().
+    """
+    models = (ProductSearchDocument, Product.category.through, Product, Brand, Category)
+    with transaction.atomic(), connection.cursor() as cursor:
+        for model in models:
+            cursor.execute(f'DELETE FROM {connection.ops.quote_name(model._meta.db_table)}')
+    for label in ('brand', 'category', 'product'):
+        bump_response_cache_version(label)
@@ -1,8 +1,23 @@
 import json
+import time
+from collections.abc import Mapping
+from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist, SuspiciousFileOperation
+from django.core.files.utils import validate_file_name
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import models, router, transaction
+from django.db.models.signals import m2m_changed
 from rest_framework import serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import MANY_RELATION_KWARGS, PKOnlyObject
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
 from django.contrib.auth.models import User
-from .models import Category, Brand, Product
-from django.conf import settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from PIL import Image
+from .identity import get_related_objects
+from .instrumentation import get_current_metrics
+from .media import MediaURLBuilder, schedule_media_processing
+from .models import Category, Brand, Product, BrandStats, CategoryStats
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -16,23 +31,207 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class RegisterSerializer(UserSerializer):
+    """
+    UserSerializer that also returns a refresh/access token pair, minted from
+    the saved instance so registration never looks the user up again.
+    """
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        refresh = RefreshToken.for_user(instance)
+        data['refresh'] = str(refresh)
+        data['access'] = str(refresh.access_token)
+        return data
+
+
+class CompiledReadMixin:
+    """
+    Read-only fast path for `to_representation`.
+
+    The field plan (how each output key is read and converted) is worked out
+    once per serializer class and field set, then replayed for every row
+    instead of going through DRF's per-field `get_attribute` and
+    `to_representation` machinery.
+    Serializers made only of model columns (e.g. BrandSerializer) also accept
+    `.values()` rows. Set `compiled = False` to use the stock implementation.
+    """
+    compiled = True
+    _compiled_plans = {}
+
+    # Exact field types whose to_representation is a plain conversion.
+    simple_converters = {
+        serializers.IntegerField: int,
+        serializers.CharField: str,
+    }
+
+    def get_compiled_plan(self):
+        plan = getattr(self, '_compiled_plan', None)
+        if plan is None:
+            # The field set can vary per request (see SparseFieldsetMixin).
+            key = (type(self), tuple((name, type(field)) for name, field in self.fields.items()))
+            plan = CompiledReadMixin._compiled_plans.get(key)
+            if plan is None:
+                plan = CompiledReadMixin._compiled_plans[key] = compile_read_plan(self)
+            self._compiled_plan = plan
+        return plan
+
+    def to_representation(self, instance):
+        if not self.compiled:
+            return super().to_representation(instance)
+        return render_read_plan(self.get_compiled_plan(), instance, self)
+
+
+class SparseFieldsetMixin:
+    """
+    Trims a top-level read serializer using the request's query parameters.
+
+    `?fields=` and `?omit=` take comma separated field names to keep or drop.
+    When `?expand=` is given, nested relations not listed in it are rendered
+    as primary keys instead of nested objects.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS or not is_top_level(self):
+            return fields
+
+        params = getattr(request, 'query_params', request.GET)
+        keep = parse_field_list(params.get('fields'))
+        omit = parse_field_list(params.get('omit'))
+        # A bare `?expand=` collapses every nested relation.
+        expand = (parse_field_list(params['expand']) or set()) if 'expand' in params else None
+        if keep is not None:
+            fields = {name: field for name, field in fields.items() if name in keep}
+        if omit is not None:
+            fields = {name: field for name, field in fields.items() if name not in omit}
+        if expand is not None:
+            for name, field in fields.items():
+                if name in expand or not isinstance(field, serializers.BaseSerializer):
+                    continue
+                kwargs = {'read_only': True}
+                if field.source != name:
+                    kwargs['source'] = field.source
+                if isinstance(field, serializers.ListSerializer):
+                    kwargs['many'] = True
+                fields[name] = serializers.PrimaryKeyRelatedField(**kwargs)
+        return fields
+
+
+class SerializationTimingMixin:
+    """
+    Adds the time spent serializing top-level objects to the request's
+    metrics (see testing_app.instrumentation).
+    """
+
+    def to_representation(self, instance):
+        metrics = get_current_metrics()
+        if metrics is None or not is_top_level(self):
+            return super().to_representation(instance)
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.serialize_ms += (time.perf_counter() - start) * 1000
+
+
+def is_top_level(serializer):
+    parent = serializer.parent
+    if isinstance(parent, serializers.ListSerializer):
+        parent = parent.parent
+    return parent is None
+
+
+def parse_field_list(value):
+    if value is None:
+        return None
+    names = {name.strip() for name in value.split(',') if name.strip()}
+    return names or None
+
+
+def compile_read_plan(serializer):
+    model = getattr(getattr(serializer, 'Meta', None), 'model', None)
+    plan = []
+    for field in serializer._readable_fields:
+        name = field.field_name
+        if isinstance(field, serializers.SerializerMethodField):
+            plan.append(('method', name, field.method_name))
+        elif isinstance(field, serializers.ListSerializer) and len(field.source_attrs) == 1:
+            plan.append(('many', name, field.source, compile_read_plan(field.child)))
+        elif isinstance(field, serializers.BaseSerializer) and len(field.source_attrs) == 1:
+            plan.append(('nested', name, field.source, compile_read_plan(field)))
+        elif is_concrete_column(model, field):
+            converter = CompiledReadMixin.simple_converters.get(type(field), field.to_representation)
+            plan.append(('column', name, field.source, converter))
+        else:
+            plan.append(('field', name, field))
+    return plan
+
+
+def is_concrete_column(model, field):
+    if model is None or len(field.source_attrs) != 1:
+        return False
+    try:
+        model_field = model._meta.get_field(field.source)
+    except FieldDoesNotExist:
+        return False
+    return model_field.concrete and not model_field.is_relation
+
+
+def render_read_plan(plan, instance, serializer):
+    is_row = isinstance(instance, Mapping)
+    ret = {}
+    for entry in plan:
+        kind, name = entry[0], entry[1]
+        if kind == 'column':
+            value = instance[entry[2]] if is_row else getattr(instance, entry[2])
+            ret[name] = None if value is None else entry[3](value)
+        elif kind == 'method':
+            ret[name] = getattr(serializer, entry[2])(instance)
+        elif kind == 'nested':
+            try:
+                value = getattr(instance, entry[2])
+            except ObjectDoesNotExist:
+                value = None
+            ret[name] = None if value is None else render_read_plan(
+                entry[3], value, serializer.fields[name]
+            )
+        elif kind == 'many':
+            value = getattr(instance, entry[2])
+            if isinstance(value, models.manager.BaseManager):
+                value = value.all()
+            child = serializer.fields[name].child
+            ret[name] = [render_read_plan(entry[3], item, child) for item in value]
+        else:
+            field = serializer.fields[name]
+            try:
+                attribute = field.get_attribute(instance)
+            except SkipField:
+                continue
+            check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+            ret[name] = None if check_for_none is None else field.to_representation(attribute)
+    return ret
+
+
+class CategorySerializer(SparseFieldsetMixin, SerializationTimingMixin, CompiledReadMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = "__all__"
 
 
-class BrandSerializer(serializers.ModelSerializer):
+class BrandSerializer(SparseFieldsetMixin, SerializationTimingMixin, CompiledReadMixin, serializers.ModelSerializer):
     class Meta:
         model = Brand
         fields = "__all__"
 
 
-class RetrieveProductSerializer(serializers.ModelSerializer):
+class RetrieveProductSerializer(SparseFieldsetMixin, SerializationTimingMixin, CompiledReadMixin, serializers.ModelSerializer):
     brand = BrandSerializer()
     category = CategorySerializer(many=True)
     total_price = serializers.SerializerMethodField()
     image = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
     file = serializers.SerializerMethodField()
 
     class Meta:
@@ -43,32 +242,205 @@ class RetrieveProductSerializer(serializers.ModelSerializer):
             "brand",
             "category",
             "image",
+            "srcset",
             "file",
             "price",
             "stock",
             "total_price",
+            "media_status",
         ]
+        # Model columns read by the method fields, for sparse .only() queries.
+        method_field_sources = {
+            "image": ["image"],
+            "srcset": ["image_renditions"],
+            "file": ["file"],
+            "total_price": ["price", "stock"],
+        }
 
     def get_total_price(self, obj):
-        return obj.price * obj.stock
+        # Prefer the value annotated by ProductQuerySet.with_total_price().
+        total_price = getattr(obj, 'total_price', None)
+        if total_price is None:
+            total_price = obj.price * obj.stock
+        return total_price
+
+    def get_media_urls(self):
+        # Shared through the context by every row of the response.
+        media_urls = self.context.get("media_urls")
+        if media_urls is None:
+            media_urls = self.context["media_urls"] = MediaURLBuilder(self.context.get("request"))
+        return media_urls
 
     def get_image(self, obj):
-        if settings.DEBUG:
-            request = self.context.get("request")
-            if obj.image and request:
-                return request.build_absolute_uri(obj.image.url)
-        return obj.image.url if obj.image else None
+        return self.get_media_urls().url(obj.image.name, obj.image.storage)
+
+    def get_srcset(self, obj):
+        # Renditions by width descriptor, e.g. {"320w": url}.
+        storage = Product._meta.get_field("image").storage
+        media_urls = self.get_media_urls()
+        return {
+            f"{width}w": media_urls.url(name, storage)
+            for width, name in obj.image_renditions.get("widths", {}).items()
+        }
 
     def get_file(self, obj):
-        if settings.DEBUG:
-            request = self.context.get("request")
-            if obj.file and request:
-                return request.build_absolute_uri(obj.file.url)
-        return obj.file.url if obj.file else None
+        return self.get_media_urls().url(obj.file.name, obj.file.storage)
+
+
+class ProductListingSerializer(RetrieveProductSerializer):
+    """
+    RetrieveProductSerializer that reads the brand and categories from the
+    denormalized `Product.listing` column, so the rows need no join or
+    prefetch. Renders the same output.
+    """
+    brand = serializers.SerializerMethodField()
+    category = serializers.SerializerMethodField()
+
+    class Meta(RetrieveProductSerializer.Meta):
+        method_field_sources = {
+            **RetrieveProductSerializer.Meta.method_field_sources,
+            "brand": ["listing"],
+            "category": ["listing"],
+        }
+
+    def get_brand(self, obj):
+        return obj.listing.get("brand")
+
+    def get_category(self, obj):
+        return obj.listing.get("category", [])
+
+
+
+class BatchedManyRelatedField(serializers.ManyRelatedField):
+    """
+    ManyRelatedField that resolves every primary key of the list together
+    through `get_related_objects`: rows already resolved in this request
+    need no query and the rest are fetched with one `pk__in` query instead
+    of one query per item.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        child = self.child_relation
+        pk_field = child.queryset.model._meta.pk
+        pks, errors = [], []
+        for item in data:
+            if child.pk_field is not None:
+                item = child.pk_field.to_internal_value(item)
+            try:
+                if isinstance(item, bool):
+                    raise TypeError
+                pks.append(pk_field.to_python(item))
+            except (TypeError, ValueError, DjangoValidationError):
+                errors.append(child.error_messages['incorrect_type'].format(
+                    data_type=type(item).__name__
+                ))
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        pks = list(dict.fromkeys(pks))
+        found = get_related_objects(child.get_queryset(), pks)
+        missing = [pk for pk in pks if pk not in found]
+        if missing:
+            raise serializers.ValidationError([
+                child.error_messages['does_not_exist'].format(pk_value=pk) for pk in missing
+            ])
+        return [found[pk] for pk in pks]
+
+
+class BatchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField that resolves through `get_related_objects`, and
+    through BatchedManyRelatedField with many=True.
+    """
+
+    def to_internal_value(self, data):
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        queryset = self.get_queryset()
+        try:
+            if isinstance(data, bool):
+                raise TypeError
+            pk = queryset.model._meta.pk.to_python(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        obj = get_related_objects(queryset, [pk]).get(pk)
+        if obj is None:
+            self.fail('does_not_exist', pk_value=pk)
+        return obj
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BatchedManyRelatedField(**list_kwargs)
+
 
+def set_many_related(instance, field_name, objs, created=False):
+    """
+    Make `objs` the objects related to `instance` through the many-to-many
+    `field_name`, writing only the difference: one DELETE for the removed
+    links and one INSERT for the added ones, after a SELECT of the current
+    links unless the instance was just `created`.
+
+    Sends the same m2m_changed signals as RelatedManager.remove()/add().
+    """
+    manager = getattr(instance, field_name)
+    through = manager.through
+    source = through._meta.get_field(manager.source_field_name).attname
+    target = through._meta.get_field(manager.target_field_name).attname
+    db = router.db_for_write(through, instance=instance)
+
+    wanted = list(dict.fromkeys(obj.pk for obj in objs))
+    if created:
+        current = set()
+    else:
+        current = set(
+            through._default_manager.using(db)
+            .filter(**{source: instance.pk})
+            .values_list(target, flat=True)
+        )
+    removed = current.difference(wanted)
+    added = [pk for pk in wanted if pk not in current]
+
+    def send(action, pk_set):
+        m2m_changed.send(
+            sender=through, action=action, instance=instance, reverse=False,
+            model=manager.model, pk_set=pk_set, using=db,
+        )
+
+    with transaction.atomic(using=db, savepoint=False):
+        if removed:
+            send('pre_remove', removed)
+            through._default_manager.using(db).filter(
+                **{source: instance.pk, f'{target}__in': removed}
+            ).delete()
+            send('post_remove', removed)
+        if added:
+            send('pre_add', set(added))
+            through._default_manager.using(db).bulk_create([
+                through(**{source: instance.pk, target: pk}) for pk in added
+            ])
+            send('post_add', set(added))
+    getattr(instance, '_prefetched_objects_cache', {}).pop(field_name, None)
 
 
 class ProductSerializer(serializers.ModelSerializer):
+    # Pillow checks the image header here so a bad upload gets a 400; the
+    # write to storage and the renditions happen in the media worker pool
+    # (see testing_app.media).
+    image = serializers.ImageField(max_length=100)
+    file = serializers.FileField(max_length=100)
+    upload_fields = ("image", "file")
+    brand = BatchedPrimaryKeyRelatedField(queryset=Brand.objects.all())
+    category = BatchedPrimaryKeyRelatedField(queryset=Category.objects.all(), many=True)
+
     class Meta:
         model = Product
         fields = [
@@ -80,10 +452,257 @@ class ProductSerializer(serializers.ModelSerializer):
             "file",
             "price",
             "stock",
+            "media_status",
         ]
+        read_only_fields = ["media_status"]
 
     def validate_price(self, value):
         if value < 0:
             raise serializers.ValidationError("Price cannot be negative")
         return value
 
+    def create(self, validated_data):
+        uploads = self.pop_uploads(validated_data)
+        categories = validated_data.pop("category", None)
+        instance = super().create(validated_data)
+        if categories is not None:
+            set_many_related(instance, "category", categories, created=True)
+        if uploads:
+            schedule_media_processing(instance.pk, uploads)
+        return instance
+
+    def update(self, instance, validated_data):
+        uploads = self.pop_uploads(validated_data)
+        categories = validated_data.pop("category", None)
+        instance = super().update(instance, validated_data)
+        if categories is not None:
+            set_many_related(instance, "category", categories)
+        if uploads:
+            schedule_media_processing(instance.pk, uploads)
+        return instance
+
+    def pop_uploads(self, validated_data):
+        uploads = {
+            name: validated_data.pop(name)
+            for name in self.upload_fields
+            if name in validated_data
+        }
+        if uploads:
+            validated_data['media_status'] = Product.MediaStatus.PENDING
+        return uploads
+
+
+
+
+class BulkProductListSerializer(serializers.ListSerializer):
+    """
+    Validates a whole batch in one pass without stopping at invalid items.
+
+    `validated_data` stays aligned with the input: invalid items are `None`
+    and their errors are kept in `item_errors` by index. For updates,
+    `instance` is a mapping of pk to Product and every item carries its `id`.
+    """
+
+    def to_internal_value(self, data):
+        self.item_errors = {}
+        self._index = 0
+        self._names = set()
+        return super().to_internal_value(data)
+
+    def run_child_validation(self, data):
+        index = self._index
+        self._index += 1
+        try:
+            attrs = self.validate_item(data)
+        except serializers.ValidationError as exc:
+            self.item_errors[index] = exc.detail
+            return None
+        finally:
+            self.child.instance = None
+        return attrs
+
+    def validate_item(self, data):
+        if not isinstance(data, dict):
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: ['Expected an object.']
+            })
+        instance = None
+        if self.instance is not None:
+            instance = self.instance.get(parse_pk(data.get('id')))
+            if instance is None:
+                raise serializers.ValidationError({'id': ['Object with this id does not exist.']})
+        self.child.instance = instance
+        self.child.initial_data = data
+        attrs = self.child.run_validation(data)
+
+        # UniqueValidator only looks at the database, so catch clashes
+        # inside the batch before they abort the bulk insert.
+        name = attrs.get('name')
+        if name is not None:
+            if name in self._names:
+                raise serializers.ValidationError({'name': ['Duplicate name in this batch.']})
+            self._names.add(name)
+        if instance is not None:
+            attrs['id'] = instance.pk
+        return attrs
+
+    def save(self, **kwargs):
+        validated_data = [
+            None if attrs is None else {**attrs, **kwargs}
+            for attrs in self.validated_data
+        ]
+        if self.instance is not None:
+            return self.update(self.instance, validated_data)
+        return self.create(validated_data)
+
+    @transaction.atomic
+    def create(self, validated_data):
+        products, categories = [], []
+        for attrs in validated_data:
+            if attrs is None:
+                continue
+            attrs = dict(attrs)
+            categories.append(attrs.pop('category', []))
+            products.append(Product(**attrs))
+        Product.objects.bulk_create(products)
+        self.set_categories(products, categories, replace=False)
+        return products
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        products, categories, fields = [], [], set()
+        for attrs in validated_data:
+            if attrs is None:
+                continue
+            attrs = dict(attrs)
+            product = instance[attrs.pop('id')]
+            if 'category' in attrs:
+                categories.append((product, attrs.pop('category')))
+            for attr, value in attrs.items():
+                setattr(product, attr, value)
+            fields.update(attrs)
+            products.append(product)
+        if products and fields:
+            Product.objects.bulk_update(products, sorted(fields))
+        if categories:
+            self.set_categories(*zip(*categories), replace=True)
+        return products
+
+    def set_categories(self, products, categories, replace):
+        """
+        Link each product to its categories. With `replace`, existing links
+        are read in one query and only the difference is written: one DELETE
+        for the links that go and one INSERT for the new ones.
+        """
+        through = Product.category.through
+        wanted = {
+            product.pk: list(dict.fromkeys(category.pk for category in product_categories))
+            for product, product_categories in zip(products, categories)
+        }
+        current, removed = {}, []
+        if replace:
+            for link_id, product_id, category_id in through.objects.filter(
+                product_id__in=wanted
+            ).values_list('pk', 'product_id', 'category_id'):
+                if category_id in wanted[product_id]:
+                    current.setdefault(product_id, set()).add(category_id)
+                else:
+                    removed.append(link_id)
+        if removed:
+            through.objects.filter(pk__in=removed).delete()
+        through.objects.bulk_create([
+            through(product_id=product_id, category_id=category_id)
+            for product_id, category_ids in wanted.items()
+            for category_id in category_ids
+            if category_id not in current.get(product_id, ())
+        ])
+
+
+def parse_pk(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class StoredFileNameField(serializers.CharField):
+    """
+    Name of a file already in the storage of the model field `model_field`,
+    under its `upload_to` directory. With `image=True` it must also be an
+    image Pillow can read, as the upload path checks.
+    """
+    default_error_messages = {
+        'invalid_name': 'Must be the name of a file under "{directory}".',
+        'does_not_exist': 'File "{name}" does not exist.',
+        'invalid_image': 'Upload a valid image. The file you uploaded was either not an image or a corrupted image.',
+    }
+
+    def __init__(self, model_field, image=False, **kwargs):
+        self.model_field = model_field
+        self.image = image
+        kwargs.setdefault('max_length', model_field.max_length)
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        name = super().to_internal_value(data)
+        directory = self.model_field.upload_to.rstrip('/') + '/'
+        try:
+            validate_file_name(name, allow_relative_path=True)
+        except SuspiciousFileOperation:
+            self.fail('invalid_name', directory=directory)
+        if not name.startswith(directory):
+            self.fail('invalid_name', directory=directory)
+
+        storage = self.model_field.storage
+        if not storage.exists(name):
+            self.fail('does_not_exist', name=name)
+        if self.image:
+            try:
+                with storage.open(name) as content, Image.open(content) as image:
+                    image.verify()
+            except Exception:
+                self.fail('invalid_image')
+        return name
+
+
+class BulkProductSerializer(ProductSerializer):
+    """
+    Product item for the bulk endpoint. Uploads cannot travel in a JSON
+    array, so `image` and `file` are names of files already in storage.
+    """
+    image = StoredFileNameField(Product._meta.get_field('image'), image=True)
+    file = StoredFileNameField(Product._meta.get_field('file'))
+    upload_fields = ()
+
+    class Meta(ProductSerializer.Meta):
+        list_serializer_class = BulkProductListSerializer
+
+
+class BrandStatsSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source='brand_id', read_only=True)
+    name = serializers.CharField(source='brand.name', read_only=True)
+
+    class Meta:
+        model = BrandStats
+        fields = ('id', 'name', 'product_count', 'total_stock', 'inventory_value')
+
+
+class CategoryStatsSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source='category_id', read_only=True)
+    name = serializers.CharField(source='category.name', read_only=True)
+
+    class Meta:
+        model = CategoryStats
+        fields = ('id', 'name', 'product_count', 'total_stock', 'inventory_value')
+
+
+class CatalogTotalsSerializer(serializers.Serializer):
+    product_count = serializers.IntegerField()
+    total_stock = serializers.IntegerField()
+    inventory_value = serializers.DecimalField(max_digits=20, decimal_places=2)
+
+
+class CatalogStatsSerializer(serializers.Serializer):
+    totals = CatalogTotalsSerializer()
+    brands = BrandStatsSerializer(many=True)
+    categories = CategoryStatsSerializer(many=True)
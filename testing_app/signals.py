@@ -0,0 +1,117 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.contrib.auth.models import User
+from django.dispatch import Signal, receiver
+from .authentication import invalidate_cached_user
+from .cache import bump_response_cache_version
+from .db import configure_sqlite_connection
+from .instrumentation import install_query_recorder
+from .media import schedule_rendition_deletion, schedule_rendition_updates
+from .models import Brand, Category, Product
+from .search import index_products
+
+# Sent after bulk writes that bypass post_save and m2m_changed, with the pks of
+# the created or updated products as `product_ids`.
+products_bulk_changed = Signal()
+
+
+@receiver(post_save, sender=Brand, dispatch_uid='brand_saved_cache')
+@receiver(post_delete, sender=Brand, dispatch_uid='brand_deleted_cache')
+@receiver(post_save, sender=Category, dispatch_uid='category_saved_cache')
+@receiver(post_delete, sender=Category, dispatch_uid='category_deleted_cache')
+@receiver(post_save, sender=Product, dispatch_uid='product_saved_cache')
+@receiver(post_delete, sender=Product, dispatch_uid='product_deleted_cache')
+def invalidate_cached_responses(sender, **kwargs):
+    bump_response_cache_version(sender._meta.model_name)
+
+
+@receiver(m2m_changed, sender=Product.category.through, dispatch_uid='product_category_changed_cache')
+def invalidate_cached_product_responses(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_response_cache_version(Product._meta.model_name)
+
+
+@receiver(products_bulk_changed, sender=Product, dispatch_uid='products_bulk_changed_cache')
+def invalidate_cached_bulk_product_responses(sender, **kwargs):
+    bump_response_cache_version(Product._meta.model_name)
+
+
+@receiver(post_save, sender=Product, dispatch_uid='product_saved_renditions')
+def update_product_renditions(sender, instance, **kwargs):
+    schedule_rendition_updates([instance])
+
+
+@receiver(post_delete, sender=Product, dispatch_uid='product_deleted_renditions')
+def delete_product_renditions(sender, instance, **kwargs):
+    schedule_rendition_deletion(instance)
+
+
+@receiver(products_bulk_changed, sender=Product, dispatch_uid='products_bulk_changed_renditions')
+def update_bulk_product_renditions(sender, product_ids, **kwargs):
+    schedule_rendition_updates(
+        Product.objects.filter(pk__in=product_ids).only('image', 'image_renditions')
+    )
+
+
+@receiver(post_save, sender=Product, dispatch_uid='product_saved_search')
+@receiver(post_delete, sender=Product, dispatch_uid='product_deleted_search')
+def update_product_search_document(sender, instance, **kwargs):
+    index_products([instance.pk])
+
+
+@receiver(products_bulk_changed, sender=Product, dispatch_uid='products_bulk_changed_search')
+def update_bulk_product_search_documents(sender, product_ids, **kwargs):
+    index_products(product_ids)
+
+
+@receiver(post_save, sender=Brand, dispatch_uid='brand_saved_search')
+def update_brand_search_documents(sender, instance, created, **kwargs):
+    if not created:
+        index_products(instance.product_set.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Category, dispatch_uid='category_saved_search')
+def update_category_search_documents(sender, instance, created, **kwargs):
+    if not created:
+        index_products(instance.product_set.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Category, dispatch_uid='category_deleting_search')
+def collect_category_products(sender, instance, **kwargs):
+    # The links are gone by post_delete, which m2m_changed does not report.
+    instance.search_product_ids = list(instance.product_set.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Category, dispatch_uid='category_deleted_search')
+def update_deleted_category_search_documents(sender, instance, **kwargs):
+    index_products(getattr(instance, 'search_product_ids', ()))
+
+
+@receiver(m2m_changed, sender=Product.category.through, dispatch_uid='product_category_changed_search')
+def update_linked_search_documents(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # Clearing a category's products does not say which they were.
+        instance.search_product_ids = list(instance.product_set.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        if not reverse:
+            index_products([instance.pk])
+        elif action == 'post_clear':
+            index_products(getattr(instance, 'search_product_ids', ()))
+        else:
+            index_products(pk_set)
+
+
+@receiver(post_save, sender=User, dispatch_uid='user_saved_auth_cache')
+@receiver(post_delete, sender=User, dispatch_uid='user_deleted_auth_cache')
+def invalidate_authenticated_user(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(connection_created, dispatch_uid='sqlite_connection_pragmas')
+def configure_connection(sender, connection, **kwargs):
+    configure_sqlite_connection(connection)
+
+
+@receiver(connection_created, dispatch_uid='query_metrics')
+def instrument_connection(sender, connection, **kwargs):
+    install_query_recorder(connection)
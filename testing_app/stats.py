@@ -0,0 +1,101 @@
+from decimal import Decimal
+from django.db import connection, transaction
+from django.db.models import Sum
+from .models import Brand, BrandStats, Category, CategoryStats, Product
+
+
+def get_table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def get_rollup_sql(stats_model):
+    """
+    SELECT computing the rollup rows of `stats_model` from the products:
+    id, product_count, total_stock and the inventory value in cents, summed
+    in cents so it is exact.
+    """
+    if stats_model is BrandStats:
+        return f'''
+            SELECT brand.id AS id, COUNT(product.id) AS product_count,
+                COALESCE(SUM(product.stock), 0) AS total_stock,
+                COALESCE(SUM(CAST(ROUND(product.price * 100) AS INTEGER) * product.stock), 0) AS cents
+            FROM {get_table(Brand)} AS brand
+            LEFT JOIN {get_table(Product)} AS product ON product.brand_id = brand.id
+            GROUP BY brand.id
+        '''
+    return f'''
+        SELECT category.id AS id, COUNT(product.id) AS product_count,
+            COALESCE(SUM(product.stock), 0) AS total_stock,
+            COALESCE(SUM(CAST(ROUND(product.price * 100) AS INTEGER) * product.stock), 0) AS cents
+        FROM {get_table(Category)} AS category
+        LEFT JOIN {get_table(Product.category.through)} AS link ON link.category_id = category.id
+        LEFT JOIN {get_table(Product)} AS product ON product.id = link.product_id
+        GROUP BY category.id
+    '''
+
+
+def compute_rollups(stats_model):
+    """
+    Map each group id to its (product_count, total_stock, inventory_value)
+    recomputed from scratch.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(get_rollup_sql(stats_model))
+        return {
+            pk: (count, stock, Decimal(cents) / 100)
+            for pk, count, stock, cents in cursor.fetchall()
+        }
+
+
+def check_rollups(stats_model):
+    """
+    Compare the stored rollup rows of `stats_model` with recomputed ones
+    and return a list of (group id, stored, expected) for every row that
+    differs; a missing row is None.
+    """
+    expected = compute_rollups(stats_model)
+    stored = {
+        pk: (count, stock, value)
+        for pk, count, stock, value in stats_model.objects.values_list(
+            'pk', 'product_count', 'total_stock', 'inventory_value'
+        )
+    }
+    return [
+        (pk, stored.get(pk), expected.get(pk))
+        for pk in sorted(expected.keys() | stored.keys())
+        if stored.get(pk) != expected.get(pk)
+    ]
+
+
+def rebuild_rollups(stats_model):
+    """
+    Replace the rollup rows of `stats_model` with recomputed ones and
+    return their number.
+    """
+    key = stats_model._meta.pk.column
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {get_table(stats_model)}')
+        cursor.execute(f'''
+            INSERT INTO {get_table(stats_model)} ({key}, product_count, total_stock, inventory_value)
+            SELECT id, product_count, total_stock, cents / 100.0
+            FROM ({get_rollup_sql(stats_model)})
+        ''')
+        return cursor.rowcount
+
+
+def get_catalog_stats():
+    """
+    Product count, stock and inventory value of the whole catalog and of
+    every brand and category, read from the rollup tables: the cost grows
+    with the number of groups, not of products.
+    """
+    totals = BrandStats.objects.aggregate(
+        product_count=Sum('product_count'),
+        total_stock=Sum('total_stock'),
+        inventory_value=Sum('inventory_value'),
+    )
+    return {
+        'totals': {name: value or 0 for name, value in totals.items()},
+        'brands': BrandStats.objects.select_related('brand').order_by('brand_id'),
+        'categories': CategoryStats.objects.select_related('category').order_by('category_id'),
+    }
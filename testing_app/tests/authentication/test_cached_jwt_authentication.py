@@ -0,0 +1,79 @@
+from datetime import timedelta
+from django.contrib.auth.models import User
+from rest_framework.test import APITestCase, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.tokens import AccessToken
+from testing_app.authentication import (
+    CachedJWTAuthentication,
+    ExpiringLRUCache,
+    authenticated_users,
+    validated_tokens,
+)
+
+
+class CachedJWTAuthenticationTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser", password="testpassword")
+
+    def setUp(self):
+        validated_tokens.clear()
+        authenticated_users.clear()
+        self.authentication = CachedJWTAuthentication()
+        self.token = str(AccessToken.for_user(self.user))
+
+    def authenticate(self, token):
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        return self.authentication.authenticate(request)
+
+    def test_authenticate(self):
+        user, validated_token = self.authenticate(self.token)
+        self.assertEqual(user, self.user)
+        self.assertEqual(validated_token["user_id"], self.user.pk)
+
+    def test_repeat_authentication_is_cached(self):
+        self.authenticate(self.token)
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate(self.token)
+        self.assertEqual(user, self.user)
+
+    def test_user_save_invalidates_cache(self):
+        self.authenticate(self.token)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.token)
+
+    def test_tampered_token_is_not_served_from_cache(self):
+        self.authenticate(self.token)
+        header, payload, signature = self.token.split(".")
+        tampered = ".".join([header, payload, signature[::-1]])
+        with self.assertRaises(InvalidToken):
+            self.authenticate(tampered)
+
+    def test_expired_token_is_rejected(self):
+        token = AccessToken.for_user(self.user)
+        token.set_exp(lifetime=-timedelta(seconds=1))
+        with self.assertRaises(InvalidToken):
+            self.authenticate(str(token))
+        self.assertEqual(len(validated_tokens), 0)
+
+
+class ExpiringLRUCacheTest(APITestCase):
+
+    def test_evicts_least_recently_used(self):
+        cache = ExpiringLRUCache(maxsize=2)
+        cache.set("a", 1, float("inf"))
+        cache.set("b", 2, float("inf"))
+        cache.get("a")
+        cache.set("c", 3, float("inf"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_expired_entries_are_dropped(self):
+        cache = ExpiringLRUCache(maxsize=2)
+        cache.set("a", 1, 0)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
@@ -0,0 +1,21 @@
+from django.contrib.auth.hashers import check_password, identify_hasher, make_password
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from testing_app.hashers import ConfigurablePBKDF2PasswordHasher
+
+
+class ConfigurablePBKDF2PasswordHasherTest(APITestCase):
+
+    @override_settings(PASSWORD_HASH_ITERATIONS=1000)
+    def test_uses_configured_iterations(self):
+        encoded = make_password("testpassword")
+        self.assertIsInstance(identify_hasher(encoded), ConfigurablePBKDF2PasswordHasher)
+        self.assertEqual(encoded.split("$")[1], "1000")
+        self.assertTrue(check_password("testpassword", encoded))
+
+    def test_verifies_hashes_made_with_other_iterations(self):
+        with override_settings(PASSWORD_HASH_ITERATIONS=1000):
+            encoded = make_password("testpassword")
+        with override_settings(PASSWORD_HASH_ITERATIONS=2000):
+            self.assertTrue(check_password("testpassword", encoded))
+            self.assertTrue(identify_hasher(encoded).must_update(encoded))
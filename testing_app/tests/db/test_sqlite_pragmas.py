@@ -0,0 +1,36 @@
+import os
+import tempfile
+from django.db import connections
+from django.test import SimpleTestCase, override_settings
+
+
+class SQLitePragmasTest(SimpleTestCase):
+
+    def open_connection(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        default = connections["default"]
+        settings_dict = {**default.settings_dict, "NAME": os.path.join(directory.name, "db.sqlite3")}
+        wrapper = default.__class__(settings_dict, alias="pragmas")
+        wrapper.ensure_connection()
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def get_pragma(self, wrapper, name):
+        return wrapper.connection.execute(f"PRAGMA {name}").fetchone()[0]
+
+    def test_new_connections_are_tuned(self):
+        wrapper = self.open_connection()
+        self.assertEqual(self.get_pragma(wrapper, "journal_mode"), "wal")
+        # 1 is NORMAL.
+        self.assertEqual(self.get_pragma(wrapper, "synchronous"), 1)
+        self.assertEqual(self.get_pragma(wrapper, "busy_timeout"), 5000)
+        self.assertEqual(self.get_pragma(wrapper, "cache_size"), -20000)
+
+    @override_settings(SQLITE_PRAGMAS={"journal_mode": None, "synchronous": "full"})
+    def test_pragmas_are_configurable(self):
+        wrapper = self.open_connection()
+        self.assertEqual(self.get_pragma(wrapper, "journal_mode"), "delete")
+        # 2 is FULL.
+        self.assertEqual(self.get_pragma(wrapper, "synchronous"), 2)
+        self.assertEqual(self.get_pragma(wrapper, "cache_size"), -20000)
@@ -0,0 +1,82 @@
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from testing_app.factories import ProductFactory
+from testing_app.instrumentation import PerformanceMiddleware, log_queries, registry
+
+
+class PerformanceMiddlewareTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.products = ProductFactory.create_batch(2)
+        cls.admin = User.objects.create_superuser(username="admin", password="adminpassword")
+
+    def setUp(self):
+        registry.clear()
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse("product-list"))
+        timing = response["Server-Timing"]
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="2 queries"', timing)
+        self.assertIn('serialize;dur=', timing)
+        self.assertIn('render;dur=', timing)
+
+    def test_metrics_are_tagged_by_view_and_action(self):
+        self.client.get(reverse("product-list"))
+        self.client.get(reverse("product-list"))
+        self.client.get(reverse("product-detail", kwargs={"pk": self.products[0].pk}))
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        product_list = response.data["ProductViewSet.list"]
+        self.assertEqual(product_list["count"], 2)
+        self.assertEqual(product_list["db_queries"]["p50"], 2)
+        self.assertGreater(product_list["serialize_ms"]["p99"], 0)
+        self.assertGreater(product_list["response_bytes"]["p50"], 0)
+        self.assertEqual(set(product_list["total_ms"]), {"p50", "p95", "p99"})
+        self.assertIn("ProductViewSet.retrieve", response.data)
+
+        response = self.client.delete(reverse("metrics"))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        # Only the DELETE itself is left.
+        self.assertEqual(list(registry.summary()), ["MetricsView.delete"])
+
+    def test_middleware_stays_async_under_asgi(self):
+        async def get_response(request):
+            pass
+
+        self.assertTrue(iscoroutinefunction(PerformanceMiddleware(get_response)))
+        self.assertFalse(iscoroutinefunction(PerformanceMiddleware(lambda request: None)))
+
+    async def test_async_requests_are_timed(self):
+        token = AccessToken.for_user(self.admin)
+        response = await self.async_client.get(
+            reverse("async-product-list"), headers={"Authorization": f"Bearer {token}"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # The user lookup, the page and its categories, all run in
+        # sync_to_async threads.
+        self.assertIn('desc="3 queries"', response["Server-Timing"])
+        summary = registry.summary()["AsyncProductView.get"]
+        self.assertEqual(summary["count"], 1)
+        self.assertEqual(summary["db_queries"]["p50"], 3)
+
+    def test_metrics_require_admin(self):
+        response = self.client.get(reverse("metrics"))
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+    @override_settings(INSTRUMENTATION={"SLOW_QUERY_MS": 50, "DUPLICATE_QUERY_THRESHOLD": 3})
+    def test_slow_and_repeated_queries_are_logged(self):
+        queries = [("SELECT 1 WHERE id = %s", 1.0)] * 3 + [("SELECT 2", 80.0)]
+        with self.assertLogs("testing_app.instrumentation", "WARNING") as logs:
+            log_queries("ProductViewSet.list", queries)
+        self.assertEqual(len(logs.output), 2)
+        self.assertIn("Slow query in ProductViewSet.list (80.0ms): SELECT 2", logs.output[0])
+        self.assertIn("Possible N+1 in ProductViewSet.list, 3 runs of", logs.output[1])
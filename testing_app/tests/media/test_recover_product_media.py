@@ -0,0 +1,41 @@
+import os
+import tempfile
+import time
+from io import StringIO
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from testing_app.factories import ProductFactory
+from testing_app.models import Product
+
+
+class RecoverProductMediaTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.pending = ProductFactory(media_status=Product.MediaStatus.PENDING)
+        cls.processing = ProductFactory(media_status=Product.MediaStatus.PROCESSING)
+        cls.ready = ProductFactory()
+
+    def test_recover_product_media(self):
+        with tempfile.TemporaryDirectory() as staging, override_settings(
+            MEDIA_PROCESSING={'STAGING_DIR': staging}
+        ):
+            old = os.path.join(staging, 'old')
+            new = os.path.join(staging, 'new')
+            for path in (old, new):
+                with open(path, 'wb') as staged:
+                    staged.write(b'upload')
+            an_hour_ago = time.time() - 3600
+            os.utime(old, (an_hour_ago, an_hour_ago))
+
+            stdout = StringIO()
+            call_command('recover_product_media', stdout=stdout)
+            self.assertEqual(os.listdir(staging), ['new'])
+
+        self.assertIn('Marked the media of 2 products as failed.', stdout.getvalue())
+        self.assertIn('Deleted 1 staged uploads.', stdout.getvalue())
+        statuses = dict(Product.objects.values_list('pk', 'media_status'))
+        self.assertEqual(statuses[self.pending.pk], Product.MediaStatus.FAILED)
+        self.assertEqual(statuses[self.processing.pk], Product.MediaStatus.FAILED)
+        self.assertEqual(statuses[self.ready.pk], Product.MediaStatus.READY)
@@ -0,0 +1,96 @@
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from rest_framework.test import APITestCase
+from testing_app.factories import BrandFactory, CategoryFactory, ProductFactory
+from testing_app.models import Brand, BrandStats, Category, CategoryStats, Product
+from testing_app.seeding import seed_catalog
+from testing_app.stats import check_rollups
+
+
+class CatalogStatsTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.brand = BrandFactory()
+        cls.category1 = CategoryFactory()
+        cls.category2 = CategoryFactory()
+        cls.product = ProductFactory(
+            brand=cls.brand, category=[cls.category1, cls.category2], price=Decimal('2.50'), stock=4
+        )
+
+    def get_stats(self, stats_model, pk):
+        stats = stats_model.objects.get(pk=pk)
+        return stats.product_count, stats.total_stock, stats.inventory_value
+
+    def assertConsistent(self):
+        self.assertEqual(check_rollups(BrandStats), [])
+        self.assertEqual(check_rollups(CategoryStats), [])
+
+    def test_rollups_are_written_with_the_product(self):
+        self.assertEqual(self.get_stats(BrandStats, self.brand.pk), (1, 4, Decimal('10.00')))
+        self.assertEqual(self.get_stats(CategoryStats, self.category1.pk), (1, 4, Decimal('10.00')))
+        self.assertEqual(self.get_stats(CategoryStats, self.category2.pk), (1, 4, Decimal('10.00')))
+        self.assertConsistent()
+
+    def test_rollups_follow_product_changes(self):
+        other = BrandFactory()
+        self.product.brand = other
+        self.product.price = Decimal('0.10')
+        self.product.stock = 3
+        self.product.save()
+        self.assertEqual(self.get_stats(BrandStats, self.brand.pk), (0, 0, Decimal('0.00')))
+        self.assertEqual(self.get_stats(BrandStats, other.pk), (1, 3, Decimal('0.30')))
+        self.assertEqual(self.get_stats(CategoryStats, self.category1.pk), (1, 3, Decimal('0.30')))
+
+        Product.objects.filter(pk=self.product.pk).update(stock=7)
+        self.assertEqual(self.get_stats(CategoryStats, self.category2.pk), (1, 7, Decimal('0.70')))
+
+        self.product.delete()
+        self.assertEqual(self.get_stats(BrandStats, other.pk), (0, 0, Decimal('0.00')))
+        self.assertEqual(self.get_stats(CategoryStats, self.category1.pk), (0, 0, Decimal('0.00')))
+        self.assertConsistent()
+
+    def test_rollups_follow_category_changes(self):
+        self.product.category.remove(self.category1)
+        self.assertEqual(self.get_stats(CategoryStats, self.category1.pk), (0, 0, Decimal('0.00')))
+
+        self.category1.product_set.add(self.product)
+        self.assertEqual(self.get_stats(CategoryStats, self.category1.pk), (1, 4, Decimal('10.00')))
+
+        Category.objects.filter(pk=self.category2.pk).delete()
+        self.assertFalse(CategoryStats.objects.filter(pk=self.category2.pk).exists())
+
+        self.brand.delete()
+        self.assertFalse(BrandStats.objects.filter(pk=self.brand.pk).exists())
+        self.assertEqual(self.get_stats(CategoryStats, self.category1.pk), (0, 0, Decimal('0.00')))
+        self.assertConsistent()
+
+    def test_repeated_updates_do_not_drift(self):
+        ProductFactory.create_batch(3, brand=self.brand, category=[self.category1], price=Decimal('0.10'))
+        for stock in range(1, 40):
+            Product.objects.filter(brand=self.brand).update(price=Decimal('0.07') * stock, stock=stock * 3)
+        self.assertConsistent()
+
+    def test_rollups_cover_bulk_writes(self):
+        seed_catalog(5, brands=2, categories=3)
+        brand = Brand.objects.get(name='Brand 00000')
+        self.assertEqual(self.get_stats(BrandStats, brand.pk)[0], 3)
+        self.assertConsistent()
+
+    def test_check_command_reports_and_fixes(self):
+        BrandStats.objects.filter(pk=self.brand.pk).update(product_count=9)
+        CategoryStats.objects.filter(pk=self.category1.pk).delete()
+        stdout = StringIO()
+        with self.assertRaisesMessage(CommandError, '2 rollup rows are inconsistent'):
+            call_command('check_catalog_stats', stdout=stdout)
+        self.assertIn(f'brand {self.brand.pk}: stored (9, 4, ', stdout.getvalue())
+
+        call_command('check_catalog_stats', fix=True, stdout=StringIO())
+        self.assertEqual(self.get_stats(BrandStats, self.brand.pk), (1, 4, Decimal('10.00')))
+        self.assertEqual(self.get_stats(CategoryStats, self.category1.pk), (1, 4, Decimal('10.00')))
+
+        stdout = StringIO()
+        call_command('check_catalog_stats', stdout=stdout)
+        self.assertIn('Rollups are consistent.', stdout.getvalue())
@@ -0,0 +1,64 @@
+from decimal import Decimal
+from rest_framework.test import APITestCase
+from testing_app.factories import BrandFactory, CategoryFactory, ProductFactory
+from testing_app.models import Brand, Category, Product
+from testing_app.seeding import seed_catalog
+
+
+class ProductListingTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.brand = BrandFactory(name='Acme')
+        cls.category1 = CategoryFactory(name='Shoes')
+        cls.category2 = CategoryFactory(name='Boots')
+        cls.product = ProductFactory(brand=cls.brand, category=[cls.category2, cls.category1])
+
+    def get_listing(self, product=None):
+        return Product.objects.get(pk=(product or self.product).pk).listing
+
+    def expected(self, brand, *categories):
+        return {
+            'brand': {'id': brand.pk, 'name': brand.name},
+            'category': [
+                {'id': category.pk, 'name': category.name}
+                for category in sorted(categories, key=lambda category: category.pk)
+            ],
+        }
+
+    def test_listing_is_written_with_the_product(self):
+        self.assertEqual(self.get_listing(), self.expected(self.brand, self.category1, self.category2))
+
+    def test_listing_follows_brand_changes(self):
+        Brand.objects.filter(pk=self.brand.pk).update(name='Globex')
+        self.brand.refresh_from_db()
+        self.assertEqual(self.get_listing()['brand'], {'id': self.brand.pk, 'name': 'Globex'})
+
+        other = BrandFactory()
+        self.product.brand = other
+        self.product.save()
+        self.assertEqual(self.get_listing()['brand'], {'id': other.pk, 'name': other.name})
+
+    def test_listing_follows_category_changes(self):
+        self.category1.name = 'Sneakers'
+        self.category1.save()
+        self.product.category.remove(self.category2)
+        self.assertEqual(self.get_listing(), self.expected(self.brand, self.category1))
+
+        Category.objects.filter(pk=self.category1.pk).delete()
+        self.assertEqual(self.get_listing()['category'], [])
+
+        self.category2.product_set.add(self.product)
+        self.assertEqual(self.get_listing(), self.expected(self.brand, self.category2))
+
+    def test_listing_covers_bulk_writes(self):
+        seed_catalog(3, brands=2, categories=3)
+        for product in Product.objects.filter(name__startswith='Product ').prefetch_related('category'):
+            self.assertEqual(product.listing, self.expected(product.brand, *product.category.all()))
+
+    def test_saving_a_stale_instance_keeps_the_listing(self):
+        stale = Product.objects.get(pk=self.product.pk)
+        self.product.category.clear()
+        stale.price = Decimal('1.00')
+        stale.save()
+        self.assertEqual(self.get_listing(), self.expected(self.brand))
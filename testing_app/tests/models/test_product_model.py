@@ -1,7 +1,11 @@
+from django.core.files.base import ContentFile
 from django.db import IntegrityError
+from django.test import override_settings
 from rest_framework.test import APITestCase
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.exceptions import ValidationError
+from testing_app.factories import ProductFactory, make_image_data
+from testing_app.media import update_renditions
 from testing_app.models import Category, Brand, Product
 from decimal import Decimal
 
@@ -65,6 +69,10 @@ class ProductModelTest(APITestCase):
         self.product.save()
         self.assertFalse(self.product.is_in_stock())
 
+    def test_with_total_price(self):
+        product = Product.objects.with_total_price().get(pk=self.product.pk)
+        self.assertEqual(product.total_price, Decimal('49999.50'))
+
     def test_brand_name_property(self):
         self.assertEqual(self.product.brand_name, 'Apple')
 
@@ -140,3 +148,42 @@ class ProductModelTest(APITestCase):
         self.assertTrue(callable(self.product.save))
         self.assertTrue(hasattr(self.product, 'brand_name'))
         self.assertEqual(self.product.brand_name, self.brand.name)
+
+    def test_renditions_regenerated_only_when_image_changes(self):
+        self.product.image_renditions = {'source': self.product.image.name, 'widths': {}}
+        with self.captureOnCommitCallbacks() as unchanged:
+            self.product.stock = 10
+            self.product.save()
+
+        with self.captureOnCommitCallbacks() as changed:
+            self.product.image = 'products/other.jpg'
+            self.product.save()
+        # Both also bump the response cache versions on commit.
+        self.assertEqual(len(changed), len(unchanged) + 1)
+
+    @override_settings(PRODUCT_IMAGE_RENDITIONS={'WIDTHS': [40]})
+    def test_renditions_of_images_with_the_same_stem_do_not_collide(self):
+        png = ProductFactory(image__filename='same.png', image__format='PNG')
+        jpg = ProductFactory(image__filename='same.jpg')
+        for product in (png, jpg):
+            update_renditions(product.pk)
+            product.refresh_from_db()
+        storage = png.image.storage
+        png_rendition = png.image_renditions['widths']['40']
+        jpg_rendition = jpg.image_renditions['widths']['40']
+        self.assertNotEqual(png_rendition, jpg_rendition)
+        self.assertTrue(storage.exists(png_rendition))
+        self.assertTrue(storage.exists(jpg_rendition))
+
+        # Replacing the image deletes the renditions of the old one.
+        png.image.save('other.png', ContentFile(make_image_data(100, 100, 'red', 'PNG', 'RGB')))
+        update_renditions(png.pk)
+        png.refresh_from_db()
+        self.assertFalse(storage.exists(png_rendition))
+        self.assertTrue(storage.exists(png.image_renditions['widths']['40']))
+
+        # So does deleting the product.
+        with self.captureOnCommitCallbacks(execute=True):
+            jpg.delete()
+        self.assertFalse(storage.exists(jpg_rendition))
+        self.assertTrue(storage.exists(png.image_renditions['widths']['40']))
@@ -0,0 +1,52 @@
+from unittest import mock
+from rest_framework.test import APITestCase
+from testing_app.media import renditions_are_current
+from testing_app.models import Brand, Category, Product
+from testing_app.seeding import clear_catalog, seed_catalog
+
+
+class SeedCatalogTest(APITestCase):
+
+    def snapshot(self):
+        return [
+            (product.name, product.brand.name, product.price, product.stock,
+             sorted(category.name for category in product.category.all()))
+            for product in Product.objects.select_related('brand').prefetch_related('category').order_by('name')
+        ]
+
+    def test_seed_catalog_creates_the_requested_rows(self):
+        created = seed_catalog(25, brands=3, categories=4, categories_per_product=2, batch_size=10)
+
+        self.assertEqual(created, 25)
+        self.assertEqual(Product.objects.count(), 25)
+        self.assertEqual(Brand.objects.count(), 3)
+        self.assertEqual(Category.objects.count(), 4)
+        # Products share the category pool instead of creating their own.
+        self.assertEqual(Product.category.through.objects.count(), 50)
+
+    def test_seeded_renditions_are_current(self):
+        seed_catalog(5, brands=1, categories=2)
+        product = Product.objects.first()
+        self.assertTrue(renditions_are_current(product))
+        product.stock += 1
+        with mock.patch('testing_app.media.submit_media_task') as submit:
+            with self.captureOnCommitCallbacks(execute=True):
+                product.save()
+        submit.assert_not_called()
+
+    def test_seed_catalog_is_deterministic(self):
+        seed_catalog(20, brands=2, categories=5, seed=7)
+        first = self.snapshot()
+        clear_catalog()
+        self.assertFalse(Product.objects.exists())
+        seed_catalog(20, brands=2, categories=5, seed=7)
+
+        self.assertEqual(self.snapshot(), first)
+
+    def test_seed_catalog_varies_with_the_seed(self):
+        seed_catalog(20, brands=2, categories=5, seed=1)
+        first = self.snapshot()
+        clear_catalog()
+        seed_catalog(20, brands=2, categories=5, seed=2)
+
+        self.assertNotEqual(self.snapshot(), first)
@@ -25,6 +25,13 @@ class BrandSerializerTest(APITestCase):
         self.assertEqual(serializer.data, expected_data)
 
 
+    def test_serialization_from_values(self):
+        rows = Brand.objects.values('id', 'name')
+        serializer = BrandSerializer(rows, many=True)
+        expected_data = BrandSerializer(Brand.objects.all(), many=True).data
+        self.assertEqual(serializer.data, expected_data)
+
+
     # converting dict/json back to python object
     def test_deserialization(self):
         serializer = BrandSerializer(data=self.brand_data)
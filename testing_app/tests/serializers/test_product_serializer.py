@@ -1,9 +1,16 @@
-from rest_framework.test import APITestCase
-from testing_app.models import Brand, Category
-from testing_app.serializers import CategorySerializer, ProductSerializer, RetrieveProductSerializer
+from unittest import mock
+from django.db import connection
+from django.db.models.signals import m2m_changed
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase, APIRequestFactory
+from rest_framework.renderers import JSONRenderer
+from testing_app.models import Brand, Category, Product
+from testing_app.serializers import CategorySerializer, CompiledReadMixin, ProductSerializer, RetrieveProductSerializer
 from django.core.files.uploadedfile import SimpleUploadedFile
 from decimal import Decimal
-from testing_app.factories import ProductFactory
+from testing_app.factories import CategoryFactory, ProductFactory
+from testing_app.identity import identity_map
 
 class ProductSerializerTest(APITestCase):
 
@@ -45,14 +52,41 @@ class ProductSerializerTest(APITestCase):
                 {'id': self.category2.id, 'name': self.category2.name}
             ],
             'image': self.product.image.url,
+            'srcset': {},
             'file': self.product.file.url,
             'price': str(self.product.price),
             'stock': self.product.stock,
-            'total_price': self.product.price * self.product.stock
+            'total_price': self.product.price * self.product.stock,
+            'media_status': 'ready',
         }
         self.assertEqual(serializer.data, expected_data)
 
 
+    def test_compiled_serialization_matches_stock(self):
+        ProductFactory(category=[self.category2])
+        products = Product.objects.order_by('id')
+        compiled = RetrieveProductSerializer(products, many=True).data
+        # Off for the nested brand and category serializers too.
+        with mock.patch.object(CompiledReadMixin, 'compiled', False):
+            stock = RetrieveProductSerializer(products, many=True).data
+        self.assertEqual(JSONRenderer().render(compiled), JSONRenderer().render(stock))
+
+
+    @override_settings(DEBUG=True)
+    def test_absolute_media_urls(self):
+        request = APIRequestFactory().get('/api/products/')
+        data = RetrieveProductSerializer(self.product, context={'request': request}).data
+        self.assertEqual(data['image'], f'http://testserver/{self.product.image.url.lstrip("/")}')
+        self.assertEqual(data['file'], f'http://testserver/{self.product.file.url.lstrip("/")}')
+
+    @override_settings(MEDIA_CDN_URL='https://cdn.example.com/media')
+    def test_cdn_media_urls(self):
+        self.product.image_renditions = {'widths': {'40': 'products/renditions/a-40w.webp'}}
+        data = RetrieveProductSerializer(self.product).data
+        self.assertEqual(data['image'], f'https://cdn.example.com/media/{self.product.image.name}')
+        self.assertEqual(data['srcset'], {'40w': 'https://cdn.example.com/media/products/renditions/a-40w.webp'})
+
+
     # converting dict/json back to python object
     def test_deserialization(self):
         serializer = ProductSerializer(data=self.product_data)
@@ -91,6 +125,96 @@ class ProductSerializerTest(APITestCase):
 
 
 
+    def test_identity_map_resolves_related_objects_once(self):
+        data = {'brand': self.brand.pk, 'category': [self.category1.pk, self.category2.pk]}
+        with identity_map(), self.assertNumQueries(2):
+            for _ in range(3):
+                serializer = ProductSerializer(self.product, data=data, partial=True)
+                self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data['brand'], self.brand)
+        self.assertEqual(serializer.validated_data['category'], [self.category1, self.category2])
+
+        # Nothing is reused once the block, i.e. the request, is over.
+        with self.assertNumQueries(2):
+            serializer = ProductSerializer(self.product, data=data, partial=True)
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+
+    def test_deleted_related_objects_are_rejected_in_later_requests(self):
+        brand = Brand.objects.create(name='Samsung')
+        category = CategoryFactory()
+        data = {'brand': brand.pk, 'category': [category.pk]}
+        with identity_map():
+            serializer = ProductSerializer(self.product, data=data, partial=True)
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        # Deleted behind this process's back, as by another worker.
+        Category.objects.filter(pk=category.pk)._raw_delete('default')
+        Brand.objects.filter(pk=brand.pk)._raw_delete('default')
+        with identity_map():
+            serializer = ProductSerializer(self.product, data=data, partial=True)
+            self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors['category'], [f'Invalid pk "{data["category"][0]}" - object does not exist.'])
+        self.assertEqual(serializer.errors['brand'], [f'Invalid pk "{data["brand"]}" - object does not exist.'])
+
+    def test_categories_are_validated_in_one_query(self):
+        categories = CategoryFactory.create_batch(50)
+        serializer = ProductSerializer(
+            self.product, data={'category': [category.pk for category in categories]}, partial=True
+        )
+        with self.assertNumQueries(1):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data['category'], categories)
+
+    def test_invalid_categories_are_reported(self):
+        serializer = ProductSerializer(
+            self.product, data={'category': [self.category1.pk, 0, 'x']}, partial=True
+        )
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors['category'], ['Incorrect type. Expected pk value, received str.'])
+
+        serializer = ProductSerializer(
+            self.product, data={'category': [self.category1.pk, 0, -1]}, partial=True
+        )
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(
+            serializer.errors['category'],
+            ['Invalid pk "0" - object does not exist.', 'Invalid pk "-1" - object does not exist.'],
+        )
+
+    def test_update_writes_only_the_category_diff(self):
+        added = CategoryFactory.create_batch(3)
+        serializer = ProductSerializer(
+            self.product,
+            data={'category': [self.category2.pk] + [category.pk for category in added]},
+            partial=True,
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        actions = []
+        def receiver(action, pk_set, **kwargs):
+            actions.append((action, pk_set))
+        m2m_changed.connect(receiver, sender=Product.category.through)
+        self.addCleanup(m2m_changed.disconnect, receiver, sender=Product.category.through)
+        with CaptureQueriesContext(connection) as queries:
+            serializer.save()
+
+        through_writes = [
+            query['sql'].split(' ')[0] for query in queries.captured_queries
+            if query['sql'].startswith(('INSERT INTO "testing_app_product_category"',
+                                        'DELETE FROM "testing_app_product_category"'))
+        ]
+        self.assertEqual(through_writes, ['DELETE', 'INSERT'])
+        added_ids = {category.pk for category in added}
+        self.assertEqual(actions, [
+            ('pre_remove', {self.category1.pk}),
+            ('post_remove', {self.category1.pk}),
+            ('pre_add', added_ids),
+            ('post_add', added_ids),
+        ])
+        self.assertEqual(
+            set(self.product.category.values_list('pk', flat=True)), {self.category2.pk} | added_ids
+        )
+
     def test_nested_serializer_handling(self):
         category_serializer = CategorySerializer(data=[{'name': 'T-shirts'}, {'name': 'Shirts'}], many=True)
         self.assertTrue(category_serializer.is_valid(), category_serializer.errors)
@@ -1,6 +1,7 @@
 from django.urls import reverse, resolve
 from rest_framework.test import APITestCase
 from testing_app.views import ProductViewSet
+from testing_app.async_views import AsyncProductView
 
 
 class ProductURLTests(APITestCase):
@@ -36,3 +37,21 @@ class ProductURLTests(APITestCase):
 
         self.assertEqual(list_url, "/api/products/")
         self.assertEqual(detail_url, "/api/products/1/")
+
+    def test_product_stream_url(self):
+        url = reverse("product-stream")
+        self.assertEqual(resolve(url).func.cls, ProductViewSet)
+        self.assertEqual(url, "/api/products/stream/")
+
+    def test_product_bulk_url(self):
+        url = reverse("product-bulk")
+        self.assertEqual(resolve(url).func.cls, ProductViewSet)
+        self.assertEqual(url, "/api/products/bulk/")
+
+    def test_async_product_urls(self):
+        list_url = reverse("async-product-list")
+        detail_url = reverse("async-product-detail", args=[1])
+        self.assertEqual(resolve(list_url).func.view_class, AsyncProductView)
+        self.assertEqual(resolve(detail_url).func.view_class, AsyncProductView)
+        self.assertEqual(list_url, "/api/async/products/")
+        self.assertEqual(detail_url, "/api/async/products/1/")
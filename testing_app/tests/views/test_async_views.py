@@ -0,0 +1,93 @@
+import json
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from testing_app.factories import BrandFactory, CategoryFactory, ProductFactory
+
+
+class AsyncReadViewTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser", password="testpassword")
+        cls.token = str(AccessToken.for_user(cls.user))
+        cls.brand = BrandFactory()
+        cls.category1 = CategoryFactory()
+        cls.category2 = CategoryFactory()
+        cls.product = ProductFactory(brand=cls.brand, category=[cls.category1, cls.category2])
+        cls.product2 = ProductFactory(brand=cls.brand, category=[cls.category1])
+
+    async def get_sync(self, url, data=None):
+        response = await sync_to_async(self.client.get)(url, data)
+        return json.loads(response.content)
+
+    async def test_list_products_matches_sync(self):
+        response = await self.async_client.get(reverse("async-product-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = await self.get_sync(reverse("product-list"))
+        self.assertEqual(json.loads(response.content), expected)
+
+    async def test_list_products_paginates(self):
+        url = reverse("async-product-list")
+        response = await self.async_client.get(url, {"page_size": 1, "ordering": "-price"})
+        data = json.loads(response.content)
+        self.assertEqual(len(data["results"]), 1)
+        self.assertIn("/api/async/products/", data["next"])
+
+        response = await self.async_client.get(data["next"])
+        expected = await self.get_sync(reverse("product-list"), {"ordering": "-price"})
+        self.assertEqual(json.loads(response.content)["results"], expected["results"][1:])
+
+    async def test_list_products_sparse_fields(self):
+        response = await self.async_client.get(reverse("async-product-list"), {"fields": "id,name"})
+        self.assertEqual(set(json.loads(response.content)["results"][0]), {"id", "name"})
+
+    async def test_retrieve_product_matches_sync(self):
+        response = await self.async_client.get(
+            reverse("async-product-detail", kwargs={"pk": self.product.pk})
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = await self.get_sync(reverse("product-detail", kwargs={"pk": self.product.pk}))
+        self.assertEqual(json.loads(response.content), expected)
+
+    async def test_retrieve_missing_product(self):
+        response = await self.async_client.get(reverse("async-product-detail", kwargs={"pk": 0}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_list_categories(self):
+        response = await self.async_client.get(reverse("async-category-list"))
+        names = [item["name"] for item in json.loads(response.content)["results"]]
+        self.assertEqual(names, [self.category1.name, self.category2.name])
+
+    async def test_list_brands_unauthenticated(self):
+        response = await self.async_client.get(reverse("async-brand-list"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("Bearer", response["WWW-Authenticate"])
+
+    async def test_retrieve_brand_authenticated(self):
+        response = await self.async_client.get(
+            reverse("async-brand-detail", kwargs={"pk": self.brand.pk}),
+            headers={"Authorization": f"Bearer {self.token}"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content), {"id": self.brand.pk, "name": self.brand.name})
+
+    async def test_etag_and_not_modified_match_sync(self):
+        url = reverse("async-product-detail", kwargs={"pk": self.product.pk})
+        response = await self.async_client.get(url)
+        sync_response = await sync_to_async(self.client.get)(
+            reverse("product-detail", kwargs={"pk": self.product.pk})
+        )
+        self.assertEqual(response["ETag"], sync_response["ETag"])
+
+        response = await self.async_client.get(url, headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_content_negotiation(self):
+        response = await self.async_client.get(
+            reverse("async-category-list"), headers={"Accept": "text/csv"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_406_NOT_ACCEPTABLE)
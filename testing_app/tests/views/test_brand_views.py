@@ -41,7 +41,14 @@ class BrandViewSetTest(APITestCase):
         brands = Brand.objects.all()
         serializer = BrandSerializer(brands, many=True)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data['results'], serializer.data)
+
+    def test_list_brands_sparse_fields(self):
+        url = reverse("brand-list")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        response = self.client.get(url, {"fields": "name"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [{"name": "Brand1"}, {"name": "Brand2"}])
 
     def test_retrieve_brand_unauthenticated(self):
         url = reverse("brand-detail", kwargs={"pk": self.brand.pk})
@@ -0,0 +1,123 @@
+import json
+from unittest import mock
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APITransactionTestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from django.contrib.auth.models import User
+from testing_app.factories import BrandFactory, CategoryFactory, ProductFactory
+from testing_app.models import Category
+from testing_app.views import CategoryViewSet
+
+
+# Responses are never cached inside an open transaction, so these tests run
+# in autocommit mode like a real request would. Image renditions are then
+# rendered as soon as a product is saved, so do it inline rather than in the
+# worker pool, where finishing later would invalidate the cached responses.
+@override_settings(MEDIA_PROCESSING={"WORKERS": 0})
+class CachedViewSetTest(APITransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.brand = BrandFactory()
+        self.category = CategoryFactory()
+        self.product = ProductFactory(brand=self.brand, category=[self.category])
+
+    def test_list_is_served_from_cache(self):
+        url = reverse("product-list")
+        first = self.client.get(url)
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_cache_is_keyed_on_query_params(self):
+        url = reverse("product-list")
+        self.client.get(url)
+        with self.assertNumQueries(2):
+            self.client.get(url, {"ordering": "-price"})
+
+    def test_model_save_invalidates_cache(self):
+        url = reverse("category-detail", kwargs={"pk": self.category.pk})
+        self.client.get(url)
+        self.category.name = "Renamed"
+        self.category.save()
+        response = self.client.get(url)
+        self.assertEqual(json.loads(response.content)["name"], "Renamed")
+
+    def test_related_model_change_invalidates_product_cache(self):
+        url = reverse("product-detail", kwargs={"pk": self.product.pk})
+        self.client.get(url)
+        self.brand.name = "Renamed Brand"
+        self.brand.save()
+        response = self.client.get(url)
+        self.assertEqual(json.loads(response.content)["brand"]["name"], "Renamed Brand")
+
+    def test_m2m_change_invalidates_product_cache(self):
+        url = reverse("product-detail", kwargs={"pk": self.product.pk})
+        self.client.get(url)
+        self.product.category.add(CategoryFactory())
+        response = self.client.get(url)
+        self.assertEqual(len(json.loads(response.content)["category"]), 2)
+
+    def test_delete_invalidates_cache(self):
+        url = reverse("category-list")
+        self.client.get(url)
+        Category.objects.all().delete()
+        response = self.client.get(url)
+        self.assertEqual(json.loads(response.content)["results"], [])
+
+    def test_cached_response_requires_authentication(self):
+        user = User.objects.create_user(username="testuser", password="testpassword")
+        url = reverse("brand-list")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        self.client.credentials()
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_if_none_match_returns_not_modified(self):
+        url = reverse("product-detail", kwargs={"pk": self.product.pk})
+        etag = self.client.get(url)["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_if_none_match_with_stale_etag(self):
+        url = reverse("product-detail", kwargs={"pk": self.product.pk})
+        etag = self.client.get(url)["ETag"]
+        self.product.stock += 1
+        self.product.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+class CacheVersionCommitTest(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_read_before_commit_is_not_served_after_commit(self):
+        category = CategoryFactory()
+        url = reverse("category-detail", kwargs={"pk": category.pk})
+        # Stand in for a read on another connection, which an open
+        # transaction on this one does not stop from being cached.
+        cacheable = mock.patch.object(
+            CategoryViewSet, "is_response_cacheable", lambda self, request: request.method == "GET"
+        )
+        with cacheable:
+            with self.captureOnCommitCallbacks() as callbacks:
+                category.name = "Renamed"
+                category.save()
+                self.client.get(url)
+            with self.assertNumQueries(0):
+                self.client.get(url)
+
+            for callback in callbacks:
+                callback()
+            with self.assertNumQueries(1):
+                self.client.get(url)
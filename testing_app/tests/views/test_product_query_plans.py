@@ -0,0 +1,53 @@
+from rest_framework.test import APITestCase, APIRequestFactory
+from testing_app.views import ProductViewSet
+
+
+class ProductQueryPlanTest(APITestCase):
+    """
+    Runs EXPLAIN QUERY PLAN on the page query ProductViewSet builds for each
+    supported filter and checks the product table is read through an index.
+    """
+
+    def get_page_queryset(self, params):
+        viewset = ProductViewSet(
+            args=(), kwargs={}, action_map={"get": "list"}, format_kwarg=None
+        )
+        request = viewset.initialize_request(APIRequestFactory().get("/api/products/", params))
+        viewset.request = request
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        return viewset.paginator.get_page_queryset(queryset, request, view=viewset)
+
+    def assertProductIndex(self, params, index):
+        plan = self.get_page_queryset(params).explain()
+        product_lines = [
+            line for line in plan.splitlines() if "testing_app_product " in line
+        ]
+        self.assertTrue(product_lines, plan)
+        for line in product_lines:
+            self.assertIn(f"INDEX {index}", line, plan)
+        self.assertNotIn("TEMP B-TREE FOR ORDER BY", plan)
+
+    def test_price_range(self):
+        self.assertProductIndex(
+            {"min_price": "10", "max_price": "20", "ordering": "price"},
+            "product_price_id_idx",
+        )
+
+    def test_in_stock(self):
+        self.assertProductIndex({"in_stock": "true"}, "product_in_stock_idx")
+
+    def test_in_stock_by_price(self):
+        self.assertProductIndex(
+            {"in_stock": "true", "ordering": "-price"}, "product_in_stock_price_idx"
+        )
+
+    def test_brand_by_price(self):
+        self.assertProductIndex(
+            {"brand": "1", "ordering": "price"}, "product_brand_price_idx"
+        )
+
+    def test_category(self):
+        plan = self.get_page_queryset({"category": "1,2"}).explain()
+        self.assertIn("SEARCH testing_app_product USING INTEGER PRIMARY KEY", plan)
+        self.assertIn("testing_app_product_category_category_id", plan)
+        self.assertNotIn("SCAN testing_app_product", plan)
@@ -0,0 +1,104 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from testing_app.factories import BrandFactory, CategoryFactory, ProductFactory
+from testing_app.models import Product
+from testing_app.search import rebuild_index
+
+
+class ProductSearchTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.brand = BrandFactory(name='Acme')
+        cls.footwear = CategoryFactory(name='Footwear')
+        cls.accessories = CategoryFactory(name='Accessories')
+        cls.shoe = ProductFactory(name='Red running shoe', brand=cls.brand, category=[cls.footwear])
+        cls.sock = ProductFactory(name='Blue sock', brand=cls.brand, category=[cls.footwear])
+        cls.lace = ProductFactory(
+            name='Shoelace', brand=BrandFactory(name='Laces Ltd'), category=[cls.accessories]
+        )
+
+    def search(self, q, **params):
+        response = self.client.get(reverse('product-search'), {'q': q, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['id'] for item in response.data['results']]
+
+    def test_search_matches_name_brand_and_category_words(self):
+        self.assertEqual(set(self.search('shoe')), {self.shoe.pk, self.lace.pk})
+        self.assertEqual(set(self.search('acme')), {self.shoe.pk, self.sock.pk})
+        self.assertEqual(self.search('accessories'), [self.lace.pk])
+        self.assertEqual(self.search('red acme'), [self.shoe.pk])
+        self.assertEqual(self.search('nothing'), [])
+
+    def test_search_ranks_by_relevance(self):
+        best = ProductFactory(name='Shoe shoe shoe', brand=self.brand, category=[self.footwear])
+        self.assertEqual(self.search('shoe')[0], best.pk)
+
+    def test_search_paginates_by_rank(self):
+        ProductFactory.create_batch(4, brand=self.brand, category=[self.footwear])
+        expected = self.search('footwear', page_size=50)
+
+        response = self.client.get(reverse('product-search'), {'q': 'footwear', 'page_size': 2})
+        seen = [item['id'] for item in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            seen.extend(item['id'] for item in response.data['results'])
+        self.assertEqual(len(expected), 6)
+        self.assertEqual(seen, expected)
+
+    def test_search_applies_list_filters(self):
+        self.assertEqual(set(self.search('shoe', brand=self.brand.pk)), {self.shoe.pk})
+
+    def test_search_requires_words(self):
+        for q in ('', '"*^'):
+            response = self.client.get(reverse('product-search'), {'q': q})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('q', response.data)
+
+    def test_index_follows_product_changes(self):
+        self.shoe.name = 'Green boot'
+        self.shoe.save()
+        self.assertEqual(self.search('boot'), [self.shoe.pk])
+        self.assertEqual(self.search('shoe'), [self.lace.pk])
+
+        self.sock.delete()
+        self.assertEqual(self.search('sock'), [])
+
+    def test_index_follows_category_links(self):
+        self.sock.category.add(self.accessories)
+        self.assertEqual(set(self.search('accessories')), {self.sock.pk, self.lace.pk})
+
+        self.accessories.product_set.remove(self.lace)
+        self.assertEqual(self.search('accessories'), [self.sock.pk])
+
+        self.footwear.product_set.clear()
+        self.assertEqual(self.search('footwear'), [])
+
+    def test_index_follows_brand_and_category_renames_and_deletes(self):
+        self.brand.name = 'Globex'
+        self.brand.save()
+        self.assertEqual(set(self.search('globex')), {self.shoe.pk, self.sock.pk})
+
+        self.footwear.name = 'Shoes'
+        self.footwear.save()
+        self.assertEqual(set(self.search('shoes')), {self.shoe.pk, self.sock.pk})
+
+        self.footwear.delete()
+        self.assertEqual(self.search('shoes'), [])
+
+    def test_index_follows_bulk_changes(self):
+        response = self.client.post(
+            reverse('product-bulk'),
+            [{'name': 'Bulk sandal', 'brand': self.brand.pk, 'category': [self.footwear.pk],
+              'image': self.shoe.image.name, 'file': self.shoe.file.name, 'price': '5.00', 'stock': 1}],
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.search('sandal'), [response.data[0]['id']])
+
+    def test_rebuild_index(self):
+        Product.objects.filter(pk=self.sock.pk).update(name='Wool sock')
+        self.assertEqual(self.search('wool'), [])
+        self.assertEqual(rebuild_index(), 3)
+        self.assertEqual(self.search('wool'), [self.sock.pk])
@@ -1,14 +1,24 @@
+from base64 import b64encode
 from decimal import Decimal
 import json
-from urllib.parse import urlparse
+from urllib.parse import urlencode, urlparse
 from rest_framework.test import APITestCase
-from rest_framework import status
+from rest_framework import serializers, status
+from rest_framework.renderers import JSONRenderer
 from django.urls import reverse
 from testing_app.models import Product
-from testing_app.serializers import ProductSerializer, RetrieveProductSerializer
+from testing_app.serializers import BrandStatsSerializer, CategorySerializer, ProductSerializer, RetrieveProductSerializer
+from testing_app.views import build_eager_loading_plan
 from testing_app.factories import BrandFactory, CategoryFactory, ProductFactory
+import os
 import tempfile
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
 
 
 class ProductViewSetTest(APITestCase):
@@ -40,7 +50,241 @@ class ProductViewSetTest(APITestCase):
         products = Product.objects.all()
         serializer = RetrieveProductSerializer(products, many=True)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data['results'], serializer.data)
+
+    @override_settings(PRODUCT_LISTING={'DENORMALIZED_READS': True})
+    def test_list_products_query_count(self):
+        url = reverse("product-list")
+        # Brand and categories come from the denormalized listing column.
+        with self.assertNumQueries(1) as queries:
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertNotIn('testing_app_brand', queries.captured_queries[0]['sql'])
+
+        ProductFactory.create_batch(
+            5, brand=BrandFactory(), category=[self.category1, CategoryFactory()]
+        )
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 7)
+
+    @override_settings(PRODUCT_LISTING={'DENORMALIZED_READS': False})
+    def test_list_products_query_count_without_listing(self):
+        url = reverse("product-list")
+        # products + brand join, then one prefetch for categories
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.data['results'], RetrieveProductSerializer(
+            Product.objects.order_by('id'), many=True
+        ).data)
+
+    def test_eager_loading_plan_follows_dotted_and_whole_object_sources(self):
+        class ProductStatsSerializer(serializers.ModelSerializer):
+            brand_name = serializers.CharField(source='brand.name')
+            brand_stats = BrandStatsSerializer(source='brand.stats')
+            summary = CategorySerializer(source='*')
+
+            class Meta:
+                model = Product
+                fields = ('id', 'brand_name', 'brand_stats', 'summary')
+
+        select, prefetch, columns = build_eager_loading_plan(ProductStatsSerializer().fields, Product)
+        self.assertEqual(select, ['brand__stats'])
+        self.assertEqual(prefetch, [])
+        self.assertIsNone(columns)
+        with self.assertNumQueries(1):
+            data = ProductStatsSerializer(Product.objects.select_related(*select).order_by('id'), many=True).data
+        product = Product.objects.select_related('brand__stats').order_by('id').first()
+        self.assertEqual(data[0]['brand_stats']['product_count'], product.brand.stats.product_count)
+
+    def test_listing_and_joined_reads_render_the_same(self):
+        categories = CategoryFactory.create_batch(3)
+        product = ProductFactory(brand=self.brand, category=[categories[2], categories[0], categories[1]])
+        url = reverse("product-list")
+        params = {"expand": "brand,category"}
+        with override_settings(PRODUCT_LISTING={'DENORMALIZED_READS': True}):
+            listing = self.client.get(url).data['results']
+            with CaptureQueriesContext(connection) as queries:
+                joined = self.client.get(url, params).data['results']
+        self.assertEqual(listing, joined)
+        # The order must not depend on the query plan the database picks.
+        prefetch = queries.captured_queries[-1]['sql']
+        self.assertIn('"testing_app_category"', prefetch)
+        self.assertIn('ORDER BY "testing_app_category"."id" ASC', prefetch)
+        rendered = next(item for item in listing if item['id'] == product.pk)
+        self.assertEqual(
+            [category['id'] for category in rendered['category']],
+            sorted(category.pk for category in categories),
+        )
+
+    def test_list_products_cursor_pagination(self):
+        ProductFactory.create_batch(3, brand=self.brand, category=[self.category1])
+        url = reverse("product-list")
+        response = self.client.get(url, {"page_size": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['previous'])
+
+        seen = [item['id'] for item in response.data['results']]
+        next_url = response.data['next']
+        while next_url:
+            response = self.client.get(next_url)
+            seen.extend(item['id'] for item in response.data['results'])
+            next_url = response.data['next']
+        self.assertEqual(seen, list(Product.objects.order_by('id').values_list('id', flat=True)))
+
+        previous = self.client.get(response.data['previous'])
+        self.assertEqual([item['id'] for item in previous.data['results']], seen[2:4])
+
+    def test_list_products_cursor_pagination_by_price(self):
+        ProductFactory(brand=self.brand, category=[self.category1], price=Decimal('5.00'))
+        ProductFactory(brand=self.brand, category=[self.category1], price=Decimal('5.00'))
+        url = reverse("product-list")
+        seen = []
+        next_url = url + "?ordering=-price&page_size=1"
+        while next_url:
+            response = self.client.get(next_url)
+            seen.extend(item['id'] for item in response.data['results'])
+            next_url = response.data['next']
+        expected = Product.objects.order_by('-price', '-id').values_list('id', flat=True)
+        self.assertEqual(seen, list(expected))
+
+    def test_list_products_invalid_cursor(self):
+        url = reverse("product-list")
+        response = self.client.get(url, {"cursor": "cD1vb3Bz"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_products_cursor_with_invalid_id(self):
+        url = reverse("product-list")
+        cursor = b64encode(urlencode({"p": json.dumps(["abc"])}).encode("ascii")).decode("ascii")
+        response = self.client.get(url, {"cursor": cursor})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_products_cursor_with_invalid_price(self):
+        url = reverse("product-list")
+        cursor = b64encode(urlencode({"p": json.dumps(["x", "1"])}).encode("ascii")).decode("ascii")
+        response = self.client.get(url, {"cursor": cursor, "ordering": "price"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_products_ordered_by_total_price(self):
+        url = reverse("product-list")
+        response = self.client.get(url, {"ordering": "-total_price"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        totals = [Decimal(str(item['total_price'])) for item in response.data['results']]
+        self.assertEqual(totals, sorted(totals, reverse=True))
+
+    def test_list_products_total_price_range(self):
+        cheap = ProductFactory(brand=self.brand, category=[self.category1], price=Decimal('1.00'), stock=5)
+        url = reverse("product-list")
+        response = self.client.get(url, {"max_total_price": "5.00"})
+        self.assertEqual([item['id'] for item in response.data['results']], [cheap.pk])
+        response = self.client.get(url, {"min_total_price": "5.01"})
+        self.assertNotIn(cheap.pk, [item['id'] for item in response.data['results']])
+
+    def test_list_products_invalid_total_price_range(self):
+        url = reverse("product-list")
+        response = self.client.get(url, {"min_total_price": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("min_total_price", response.data)
+
+    def test_list_products_price_range(self):
+        cheap = ProductFactory(brand=self.brand, category=[self.category1], price=Decimal('0.50'))
+        url = reverse("product-list")
+        response = self.client.get(url, {"min_price": "0.10", "max_price": "0.90"})
+        self.assertEqual([item['id'] for item in response.data['results']], [cheap.pk])
+
+    def test_list_products_in_stock(self):
+        sold_out = ProductFactory(brand=self.brand, category=[self.category1], stock=0)
+        url = reverse("product-list")
+        response = self.client.get(url, {"in_stock": "true"})
+        self.assertNotIn(sold_out.pk, [item['id'] for item in response.data['results']])
+        response = self.client.get(url, {"in_stock": "false"})
+        self.assertEqual([item['id'] for item in response.data['results']], [sold_out.pk])
+        response = self.client.get(url, {"in_stock": "maybe"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_products_by_brand(self):
+        other = ProductFactory(brand=BrandFactory(), category=[self.category1])
+        url = reverse("product-list")
+        response = self.client.get(url, {"brand": other.brand.pk})
+        self.assertEqual([item['id'] for item in response.data['results']], [other.pk])
+        response = self.client.get(url, {"brand": f"{self.brand.pk},{other.brand.pk}"})
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_list_products_by_category(self):
+        other = ProductFactory(brand=self.brand, category=[CategoryFactory()])
+        url = reverse("product-list")
+        # Products in both categories are listed once.
+        response = self.client.get(url, {"category": f"{self.category1.pk},{self.category2.pk}"})
+        self.assertEqual(
+            [item['id'] for item in response.data['results']],
+            [self.product.pk, self.product2.pk],
+        )
+        self.assertNotIn(other.pk, [item['id'] for item in response.data['results']])
+        response = self.client.get(url, {"category": "1,x"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_products_sparse_fields(self):
+        url = reverse("product-list")
+        with self.assertNumQueries(1) as queries:
+            response = self.client.get(url, {"fields": "id,name,price"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name', 'price'})
+        sql = queries.captured_queries[0]['sql']
+        self.assertNotIn('"image"', sql)
+        self.assertNotIn('testing_app_brand', sql)
+
+    def test_list_products_omit_fields(self):
+        url = reverse("product-list")
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {"omit": "category,brand,file"})
+        self.assertEqual(
+            set(response.data['results'][0]),
+            {'id', 'name', 'image', 'srcset', 'price', 'stock', 'total_price', 'media_status'},
+        )
+
+    def test_list_products_expand(self):
+        url = reverse("product-list")
+        with self.assertNumQueries(2) as queries:
+            response = self.client.get(url, {"fields": "id,brand,category", "expand": "category"})
+        item = response.data['results'][0]
+        self.assertEqual(item['brand'], self.brand.pk)
+        self.assertEqual(
+            item['category'],
+            [{'id': self.category1.pk, 'name': self.category1.name},
+             {'id': self.category2.pk, 'name': self.category2.name}],
+        )
+        self.assertNotIn('testing_app_brand', queries.captured_queries[0]['sql'])
+
+        response = self.client.get(url, {"expand": ""})
+        item = response.data['results'][0]
+        self.assertEqual(item['brand'], self.brand.pk)
+        self.assertEqual(item['category'], [self.category1.pk, self.category2.pk])
+
+    def test_retrieve_product_sparse_fields(self):
+        url = reverse("product-detail", kwargs={"pk": self.product.pk})
+        response = self.client.get(url, {"fields": "name,total_price"})
+        self.assertEqual(
+            response.data,
+            {'name': self.product.name, 'total_price': self.product.price * self.product.stock},
+        )
+
+    def test_stream_products(self):
+        url = reverse("product-stream")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        data = json.loads(b''.join(response.streaming_content))
+        products = Product.objects.order_by('id')
+        serializer = RetrieveProductSerializer(
+            products, many=True, context={'request': response.wsgi_request}
+        )
+        self.assertEqual(data, json.loads(JSONRenderer().render(serializer.data)))
+
+    def test_stream_products_empty(self):
+        Product.objects.all().delete()
+        response = self.client.get(reverse("product-stream"))
+        self.assertEqual(json.loads(b''.join(response.streaming_content)), [])
 
     def test_retrieve_product(self):
         url = reverse("product-detail", kwargs={"pk": self.product.pk})
@@ -61,6 +305,189 @@ class ProductViewSetTest(APITestCase):
         self.assertEqual(len(data.get('category')), 2)
         self.assertEqual(data.get('price'), '99.99')
         self.assertEqual(data.get('stock'), 10)
+        self.assertEqual(data.get('media_status'), 'pending')
+
+    def test_create_product_processes_media(self):
+        url = reverse("product-list")
+        with tempfile.TemporaryDirectory() as staging, override_settings(
+            MEDIA_PROCESSING={'WORKERS': 0, 'STAGING_DIR': staging},
+            PRODUCT_IMAGE_RENDITIONS={'WIDTHS': [40, 80, 200]},
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(url, self.product_data, format='multipart')
+            self.assertEqual(response.data['media_status'], 'pending')
+            self.assertEqual(os.listdir(staging), [])
+        product = Product.objects.get(pk=response.data['id'])
+        self.assertEqual(product.media_status, Product.MediaStatus.READY)
+        self.assertTrue(product.image.name.startswith('products/'))
+        self.assertTrue(product.file.name.startswith('files/'))
+
+        # The 100px wide image gets renditions for the smaller widths only.
+        self.assertEqual(product.image_renditions['source'], product.image.name)
+        self.assertEqual(sorted(product.image_renditions['widths']), ['40', '80'])
+        rendition = product.image_renditions['widths']['40']
+        with product.image.storage.open(rendition) as content, Image.open(content) as image:
+            self.assertEqual((image.format, image.width), ('WEBP', 40))
+        response = self.client.get(reverse("product-detail", kwargs={"pk": product.pk}))
+        self.assertEqual(set(response.data['srcset']), {'40w', '80w'})
+        self.assertTrue(response.data['srcset']['40w'].endswith(rendition))
+
+    def test_create_product_rejects_invalid_image(self):
+        url = reverse("product-list")
+        data = {
+            **self.product_data,
+            'image': SimpleUploadedFile("fake.png", b"not an image", content_type="image/png"),
+        }
+        with tempfile.TemporaryDirectory() as staging, override_settings(
+            MEDIA_PROCESSING={'WORKERS': 0, 'STAGING_DIR': staging}
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(url, data, format='multipart')
+            self.assertEqual(os.listdir(staging), [])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('image', response.data)
+        self.assertFalse(Product.objects.filter(name=data['name']).exists())
+
+    def test_bulk_create_products(self):
+        url = reverse("product-bulk")
+        item = {
+            'brand': self.brand.pk,
+            'category': [self.category1.pk, self.category2.pk],
+            'image': self.product.image.name,
+            'file': self.product.file.name,
+            'price': '10.00',
+            'stock': 3,
+        }
+        payload = [
+            {**item, 'name': 'Bulk 1'},
+            {**item, 'name': 'Bulk 2', 'price': '-1.00'},
+            {**item, 'name': 'Bulk 3', 'category': [self.category1.pk]},
+            {**item, 'name': 'Bulk 1'},
+        ]
+        response = self.client.post(url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([result['index'] for result in response.data], [0, 1, 2, 3])
+        self.assertIn('price', response.data[1]['errors'])
+        self.assertIn('name', response.data[3]['errors'])
+
+        first = Product.objects.get(pk=response.data[0]['id'])
+        self.assertEqual(first.name, 'Bulk 1')
+        self.assertEqual(first.category.count(), 2)
+        third = Product.objects.get(pk=response.data[2]['id'])
+        self.assertEqual(list(third.category.all()), [self.category1])
+        self.assertEqual(Product.objects.count(), 4)
+
+    def test_bulk_create_resolves_shared_related_objects_once(self):
+        item = {
+            'brand': self.brand.pk,
+            'category': [self.category1.pk, self.category2.pk],
+            'image': self.product.image.name,
+            'file': self.product.file.name,
+            'price': '10.00',
+            'stock': 3,
+        }
+        payload = [{**item, 'name': f'Shared {i}'} for i in range(10)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse("product-bulk"), payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        lookups = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+            and query['sql'].split(' FROM ')[1].split(' ')[0] in ('"testing_app_brand"', '"testing_app_category"')
+        ]
+        self.assertEqual(len(lookups), 2, lookups)
+
+    def test_bulk_create_validates_stored_files(self):
+        url = reverse("product-bulk")
+        not_an_image = default_storage.save('products/fake.png', ContentFile(b'not an image'))
+        item = {
+            'brand': self.brand.pk,
+            'category': [self.category1.pk],
+            'image': self.product.image.name,
+            'file': self.product.file.name,
+            'price': '10.00',
+            'stock': 3,
+        }
+        payload = [
+            {**item, 'name': 'Stored 1', 'image': '../../etc/passwd'},
+            {**item, 'name': 'Stored 2', 'image': self.product.file.name},
+            {**item, 'name': 'Stored 3', 'image': 'products/missing.png'},
+            {**item, 'name': 'Stored 4', 'image': not_an_image},
+            {**item, 'name': 'Stored 5', 'file': 'files/../products/fake.png'},
+            {**item, 'name': 'Stored 6'},
+        ]
+        response = self.client.post(url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        errors = [result.get('errors', {}) for result in response.data]
+        self.assertEqual(errors[0]['image'], ['Must be the name of a file under "products/".'])
+        self.assertEqual(errors[1]['image'], ['Must be the name of a file under "products/".'])
+        self.assertEqual(errors[2]['image'], ['File "products/missing.png" does not exist.'])
+        self.assertIn('not an image', errors[3]['image'][0])
+        self.assertEqual(errors[4]['file'], ['Must be the name of a file under "files/".'])
+        self.assertEqual(errors[5], {})
+        self.assertEqual(list(Product.objects.filter(name__startswith='Stored').values_list('name', flat=True)), ['Stored 6'])
+
+    def test_bulk_create_products_all_invalid(self):
+        url = reverse("product-bulk")
+        response = self.client.post(url, [{'name': 'Missing fields'}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('brand', response.data[0]['errors'])
+
+    def test_bulk_create_products_not_a_list(self):
+        url = reverse("product-bulk")
+        response = self.client.post(url, {'name': 'Not a list'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_update_writes_only_the_category_diff(self):
+        url = reverse("product-bulk")
+        category3 = CategoryFactory()
+        payload = [
+            {'id': self.product.pk, 'category': [self.category1.pk, self.category2.pk]},
+            {'id': self.product2.pk, 'category': [self.category2.pk, category3.pk]},
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        through_writes = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith(('INSERT INTO "testing_app_product_category"',
+                                        'DELETE FROM "testing_app_product_category"'))
+        ]
+        self.assertEqual(len(through_writes), 2)
+        self.assertIn(f'({self.product2.pk}, {category3.pk})', through_writes[1])
+        self.assertEqual(
+            set(self.product.category.values_list('pk', flat=True)), {self.category1.pk, self.category2.pk}
+        )
+        self.assertEqual(
+            set(self.product2.category.values_list('pk', flat=True)), {self.category2.pk, category3.pk}
+        )
+
+    def test_bulk_update_products(self):
+        url = reverse("product-bulk")
+        payload = [
+            {'id': self.product.pk, 'stock': 42, 'category': [self.category2.pk]},
+            {'id': self.product2.pk, 'price': '12.50'},
+            {'id': 0, 'stock': 1},
+        ]
+        response = self.client.patch(url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('id', response.data[2]['errors'])
+
+        self.product.refresh_from_db()
+        self.product2.refresh_from_db()
+        self.assertEqual(self.product.stock, 42)
+        self.assertEqual(list(self.product.category.all()), [self.category2])
+        self.assertEqual(self.product2.price, Decimal('12.50'))
+        self.assertEqual(self.product2.category.count(), 2)
+
+    def test_bulk_delete_products(self):
+        url = reverse("product-bulk")
+        response = self.client.delete(url, [self.product.pk, 0], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0], {'index': 0, 'id': self.product.pk})
+        self.assertIn('errors', response.data[1])
+        self.assertFalse(Product.objects.filter(pk=self.product.pk).exists())
+        self.assertTrue(Product.objects.filter(pk=self.product2.pk).exists())
 
     def test_update_product(self):
         url = reverse("product-detail", kwargs={"pk": self.product.pk})
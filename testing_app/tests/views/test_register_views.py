@@ -0,0 +1,57 @@
+from unittest import mock
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from testing_app.views import RegisterView
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS=1000)
+class RegisterViewTest(APITestCase):
+
+    def setUp(self):
+        self.url = reverse("register")
+        self.user_data = {
+            "username": "newuser",
+            "email": "newuser@example.com",
+            "password": "testpassword",
+        }
+
+    def test_register(self):
+        response = self.client.post(self.url, self.user_data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        user = User.objects.get(username="newuser")
+        self.assertEqual(response.data["id"], user.pk)
+        self.assertEqual(response.data["email"], "newuser@example.com")
+        self.assertNotIn("password", response.data)
+        self.assertTrue(user.check_password("testpassword"))
+        self.assertEqual(AccessToken(response.data["access"])["user_id"], user.pk)
+
+    def test_register_does_not_reload_user(self):
+        # Username uniqueness check and the insert; no lookup afterwards.
+        with self.assertNumQueries(2):
+            response = self.client.post(self.url, self.user_data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_register_saves_through_perform_create(self):
+        with mock.patch.object(
+            RegisterView, "perform_create", autospec=True, side_effect=lambda view, serializer: serializer.save()
+        ) as perform_create:
+            response = self.client.post(self.url, self.user_data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        perform_create.assert_called_once()
+        self.assertIn("access", response.data)
+
+    def test_registered_token_authenticates(self):
+        response = self.client.post(self.url, self.user_data, format="json")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        response = self.client.get(reverse("brand-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_register_duplicate_username(self):
+        User.objects.create_user(username="newuser", password="testpassword")
+        response = self.client.post(self.url, self.user_data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("username", response.data)
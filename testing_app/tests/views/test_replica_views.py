@@ -0,0 +1,131 @@
+import json
+import os
+import tempfile
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import AccessToken
+from testing_app.cache import get_response_cache
+from testing_app.models import Brand, Category, Product
+from testing_app.routers import ReplicaRouter, replica_routing
+from testing_app.views import CategoryViewSet
+
+
+class ReplicaReadTest(APITestCase):
+    """
+    Uses a second SQLite file as the replica. Nothing copies rows between
+    the two, which makes it visible which database served a request.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        # Declared here rather than on the class because the test runner
+        # checks class-level databases before the alias exists.
+        cls.databases = {"default", "replica"}
+        cls.replica_directory = tempfile.TemporaryDirectory()
+        connections.settings["replica"] = {
+            **connections["default"].settings_dict,
+            "NAME": os.path.join(cls.replica_directory.name, "replica.sqlite3"),
+        }
+        call_command("migrate", database="replica", verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections["replica"].close()
+        del connections["replica"]
+        del connections.settings["replica"]
+        cls.replica_directory.cleanup()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser", password="testpassword")
+        cls.token = str(AccessToken.for_user(cls.user))
+        Category.objects.create(name="Primary category")
+        Category.objects.using("replica").create(name="Replica category")
+
+    def setUp(self):
+        cache.clear()
+
+    def list_category_names(self):
+        response = self.client.get(reverse("category-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item["name"] for item in response.data["results"]]
+
+    def test_safe_requests_read_from_replica(self):
+        self.assertEqual(self.list_category_names(), ["Replica category"])
+
+    def test_writes_go_to_primary_and_pin_the_client(self):
+        response = self.client.post(reverse("category-list"), {"name": "New category"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Category.objects.using("default").filter(name="New category").exists())
+        self.assertFalse(Category.objects.using("replica").filter(name="New category").exists())
+        # The cookie keeps this client on the primary for its next reads.
+        self.assertEqual(self.list_category_names(), ["Primary category", "New category"])
+
+        self.client.cookies.clear()
+        self.assertEqual(self.list_category_names(), ["Replica category"])
+
+    def test_token_clients_are_pinned_per_user(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        response = self.client.post(reverse("brand-list"), {"name": "New brand"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.client.cookies.clear()
+        response = self.client.get(reverse("brand-list"))
+        self.assertEqual([item["name"] for item in response.data["results"]], ["New brand"])
+
+    def test_authentication_reads_from_primary(self):
+        # The user only exists on the primary.
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        response = self.client.get(reverse("brand-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"], [])
+
+    def test_write_pins_rest_of_block(self):
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Brand))
+        with replica_routing() as state:
+            state.use_replica = True
+            self.assertEqual(router.db_for_read(Brand), "replica")
+            Brand.objects.create(name="Written")
+            self.assertIsNone(router.db_for_read(Brand))
+
+    def test_streamed_reads_come_from_replica(self):
+        brand = Brand.objects.using("replica").create(name="Replica brand")
+        Product.objects.using("replica").create(
+            name="Replica product", brand=brand, image="products/a.png", file="files/a.pdf",
+            price=1, stock=1,
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        response = self.client.get(reverse("product-stream"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        products = json.loads(b"".join(response.streaming_content))
+        self.assertEqual([product["name"] for product in products], ["Replica product"])
+
+    def test_replica_responses_are_cached_briefly(self):
+        response_cache = get_response_cache()
+        # Responses are not cached inside the test's transaction otherwise.
+        cacheable = mock.patch.object(
+            CategoryViewSet, "is_response_cacheable", lambda self, request: request.method == "GET"
+        )
+        with cacheable, mock.patch.object(response_cache, "set", wraps=response_cache.set) as cache_set:
+            self.list_category_names()
+            self.assertEqual(cache_set.call_args.args[2], 5)
+
+            # A pinned client reads the primary, which is never behind.
+            self.client.post(reverse("category-list"), {"name": "New category"})
+            cache_set.reset_mock()
+            self.list_category_names()
+            self.assertEqual(cache_set.call_args.args[2], 300)
+
+    async def test_async_reads_come_from_replica(self):
+        response = await self.async_client.get(reverse("async-category-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        names = [item["name"] for item in json.loads(response.content)["results"]]
+        self.assertEqual(names, ["Replica category"])
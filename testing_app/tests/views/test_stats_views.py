@@ -0,0 +1,50 @@
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from testing_app.factories import BrandFactory, CategoryFactory, ProductFactory
+
+
+class CatalogStatsViewTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpassword')
+        cls.brand1 = BrandFactory()
+        cls.brand2 = BrandFactory()
+        cls.category = CategoryFactory()
+        ProductFactory(brand=cls.brand1, category=[cls.category], price=Decimal('1.25'), stock=2)
+        ProductFactory(brand=cls.brand1, category=[cls.category], price=Decimal('3.00'), stock=1)
+        ProductFactory.create_batch(
+            20, brand=cls.brand2, category=[cls.category], price=Decimal('1.00'), stock=5
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_stats(self):
+        response = self.client.get(reverse('stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['totals'], {
+            'product_count': 22, 'total_stock': 103, 'inventory_value': '105.50',
+        })
+        self.assertEqual([dict(row) for row in response.data['brands']], [
+            {'id': self.brand1.pk, 'name': self.brand1.name, 'product_count': 2,
+             'total_stock': 3, 'inventory_value': '5.50'},
+            {'id': self.brand2.pk, 'name': self.brand2.name, 'product_count': 20,
+             'total_stock': 100, 'inventory_value': '100.00'},
+        ])
+        self.assertEqual([dict(row) for row in response.data['categories']], [
+            {'id': self.category.pk, 'name': self.category.name, 'product_count': 22,
+             'total_stock': 103, 'inventory_value': '105.50'},
+        ])
+
+    def test_stats_query_count_does_not_grow_with_products(self):
+        with self.assertNumQueries(3):
+            self.client.get(reverse('stats'))
+
+    def test_stats_requires_authentication(self):
+        self.client.force_authenticate(None)
+        response = self.client.get(reverse('stats'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -1,8 +1,19 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import CategoryViewSet, BrandViewSet, ProductViewSet, RegisterView
+from .async_views import AsyncCategoryView, AsyncBrandView, AsyncProductView
 
 router = DefaultRouter()
 router.register('categories', CategoryViewSet)
 router.register('brands', BrandViewSet)
 router.register('products', ProductViewSet)
+
+# Read-only ASGI-native counterparts of the router's list/retrieve routes.
+async_urlpatterns = [
+    path('categories/', AsyncCategoryView.as_view(), name='async-category-list'),
+    path('categories/<int:pk>/', AsyncCategoryView.as_view(), name='async-category-detail'),
+    path('brands/', AsyncBrandView.as_view(), name='async-brand-list'),
+    path('brands/<int:pk>/', AsyncBrandView.as_view(), name='async-brand-detail'),
+    path('products/', AsyncProductView.as_view(), name='async-product-list'),
+    path('products/<int:pk>/', AsyncProductView.as_view(), name='async-product-detail'),
+]
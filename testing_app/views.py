@@ -1,41 +1,394 @@
+from django.conf import settings
 from django.contrib.auth.models import User
 from rest_framework import generics, permissions
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework import viewsets
 from .models import Category, Brand, Product
-from .serializers import CategorySerializer, RetrieveProductSerializer, UserSerializer, BrandSerializer, ProductSerializer
+from .serializers import CatalogStatsSerializer, CategorySerializer, ProductListingSerializer, RetrieveProductSerializer, BrandSerializer, ProductSerializer, BulkProductSerializer, RegisterSerializer, parse_pk
 from rest_framework.permissions import IsAuthenticated
+from rest_framework import serializers
+from rest_framework.filters import OrderingFilter
+from .identity import identity_map
+from .filters import BooleanFilterBackend, RangeFilterBackend, RelatedFilterBackend
+from .cache import CachedResponseMixin
+from .instrumentation import registry
+from .routers import get_read_replica_setting, is_pinned_to_primary, pin_to_primary, replica_routing
+from .search import build_match_expression, search_products
+from .stats import get_catalog_stats
+from .signals import products_bulk_changed
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.views import APIView
+from rest_framework.utils.encoders import JSONEncoder
+from django.http import StreamingHttpResponse
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch, Q
+
+PRODUCT_LISTING_DEFAULTS = {
+    # Serve product lists from the denormalized Product.listing column.
+    'DENORMALIZED_READS': False,
+}
+
+
+def get_product_listing_setting(name):
+    return getattr(settings, 'PRODUCT_LISTING', {}).get(name, PRODUCT_LISTING_DEFAULTS[name])
+
+
+class EagerLoadingMixin:
+    """
+    Builds the queryset from the fields of the serializer in use: nested
+    serializers are loaded with select_related/prefetch_related, and for
+    sparse requests (?fields=, ?omit=, ?expand=) only the columns read by
+    the remaining fields are fetched.
+    """
+    sparse_query_params = ('fields', 'omit', 'expand')
+    _eager_loading_plans = {}
+
+    def is_sparse_request(self):
+        return self.request.method in permissions.SAFE_METHODS and any(
+            param in self.request.query_params for param in self.sparse_query_params
+        )
+
+    def get_eager_loading_plan(self):
+        if not self.is_sparse_request():
+            # Without sparse parameters the field set only depends on the
+            # serializer class, so the plan can be shared.
+            serializer_class = self.get_serializer_class()
+            plan = self._eager_loading_plans.get(serializer_class)
+            if plan is None:
+                select, prefetch, _ = build_eager_loading_plan(serializer_class().fields, self.queryset.model)
+                plan = self._eager_loading_plans[serializer_class] = (select, prefetch, None)
+            return plan
+        return build_eager_loading_plan(self.get_serializer().fields, self.queryset.model)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        select, prefetch, columns = self.get_eager_loading_plan()
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        if columns is not None:
+            queryset = queryset.only(*columns, *self.get_ordering_columns(queryset))
+        return queryset
+
+    def get_ordering_columns(self, queryset):
+        # Keyset pagination reads the ordering values off the last row.
+        ordering = list(getattr(self, 'ordering', None) or [])
+        for backend in self.filter_backends:
+            if hasattr(backend, 'get_ordering'):
+                ordering = backend().get_ordering(self.request, queryset, self) or ordering
+        columns = []
+        for field_name in ordering:
+            field_name = field_name.lstrip('-')
+            if get_concrete_field(queryset.model, field_name) is not None:
+                columns.append(field_name)
+        return columns
+
+
+def get_concrete_field(model, name):
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    return field if field.concrete else None
+
+
+def get_relation_path(model, source_attrs):
+    """
+    Return the `__` lookup and target model of the relation a dotted source
+    follows, or (None, None) when a step is not a model relation.
+    """
+    for attr in source_attrs:
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None, None
+        if not field.is_relation:
+            return None, None
+        model = field.related_model
+    return '__'.join(source_attrs), model
+
+
+def build_eager_loading_plan(fields, model):
+    """
+    Return (select_related, prefetch_related, only) for a set of serializer
+    fields. `only` is None when a field reads something that cannot be mapped
+    to a column, e.g. a model property.
+    """
+    select, prefetch, columns = [], [], {model._meta.pk.name}
+    method_sources = getattr(getattr(fields.serializer, 'Meta', None), 'method_field_sources', {})
+    for name, field in fields.items():
+        if field.write_only:
+            continue
+        if field.source == '*':
+            # Reads the instance itself, not a relation or a column.
+            columns = None
+            continue
+        if isinstance(field, (serializers.BaseSerializer, serializers.ManyRelatedField)):
+            lookup, related_model = get_relation_path(model, field.source_attrs)
+            if lookup is None:
+                # Not a chain of model relations (e.g. a property), so it
+                # cannot be eager loaded.
+                columns = None
+                continue
+        # Related lists are ordered by pk, as in the denormalized listing, so
+        # both read paths render them in the same order.
+        if isinstance(field, serializers.ListSerializer):
+            prefetch.append(Prefetch(lookup, queryset=related_model.objects.order_by('pk')))
+            continue
+        if isinstance(field, serializers.ManyRelatedField):
+            # Collapsed to primary keys, so the related rows need no columns.
+            prefetch.append(Prefetch(lookup, queryset=related_model.objects.only('pk').order_by('pk')))
+            continue
+        if isinstance(field, serializers.BaseSerializer):
+            select.append(lookup)
+
+        if isinstance(field, serializers.SerializerMethodField):
+            sources = method_sources.get(name)
+        else:
+            sources = [field.source]
+        if columns is not None and sources and all(get_concrete_field(model, c) for c in sources):
+            columns.update(sources)
+        else:
+            columns = None
+    return select, prefetch, None if columns is None else sorted(columns)
+
+
+class StreamingListMixin:
+    """
+    Adds a `stream` list action that serializes the queryset row by row and
+    sends it as a JSON array without building the whole response in memory.
+    """
+    stream_chunk_size = 500
+
+    @action(detail=False, methods=['get'])
+    def stream(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer()
+        return StreamingHttpResponse(
+            self.stream_json(queryset, serializer),
+            content_type='application/json',
+        )
+
+    def stream_json(self, queryset, serializer):
+        encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+        separator = '['
+        for obj in queryset.iterator(chunk_size=self.stream_chunk_size):
+            yield separator + encoder.encode(serializer.to_representation(obj))
+            separator = ','
+        yield '[]' if separator == '[' else ']'
+
+
+class ReplicaReadMixin:
+    """
+    Serves safe-method requests from the read replica (see
+    `testing_app.routers`). Authentication runs against the primary, and
+    clients that wrote within the last `STICKY_SECONDS` keep reading from
+    the primary so they see their own writes.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        with replica_routing() as self.replica_routing:
+            response = super().dispatch(request, *args, **kwargs)
+        if response.streaming:
+            # Streamed bodies are read after dispatch returns.
+            response.streaming_content = self.route_stream(response.streaming_content)
+        return response
+
+    def route_stream(self, content):
+        with replica_routing(self.replica_routing):
+            yield from content
+
+    def get_response_cache_timeout(self):
+        # The replica may lag behind the cache version a response is stored
+        # under, for up to STICKY_SECONDS, so keep its responses no longer.
+        timeout = super().get_response_cache_timeout()
+        if self.replica_routing.reads_from_replica:
+            return min(timeout, get_read_replica_setting('STICKY_SECONDS'))
+        return timeout
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.replica_routing.use_replica = (
+            request.method in permissions.SAFE_METHODS
+            and not is_pinned_to_primary(request)
+        )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.replica_routing.pinned:
+            pin_to_primary(request, response)
+        return response
+
+
+class IdentityMapMixin:
+    """
+    Resolves the related objects validated during a request through one
+    identity map (see `testing_app.identity`), so every item of a bulk write
+    that names the same brand or category shares one lookup.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        with identity_map():
+            return super().dispatch(request, *args, **kwargs)
+
 
 # Create your views here.
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     permission_classes = (permissions.AllowAny,)
-    serializer_class = UserSerializer  # Create a UserSerializer
-
-    def create(self, request, *args, **kwargs):
-        response = super().create(request, *args, **kwargs)
-        user = self.get_object()
-        refresh = RefreshToken.for_user(user)
-        response.data['refresh'] = str(refresh)
-        response.data['access'] = str(refresh.access_token)
-        return response
-    
+    serializer_class = RegisterSerializer
+
+
+class MetricsView(APIView):
+    """
+    Percentiles of the request metrics recorded by PerformanceMiddleware in
+    this process, per view. DELETE starts a new sample.
+    """
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request):
+        return Response(registry.summary())
+
+    def delete(self, request):
+        registry.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class CatalogStatsView(APIView):
+    """
+    Product count, stock and inventory value (price * stock) of the whole
+    catalog and of every brand and category, from the rollup tables kept
+    by the triggers of migration 0010.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response(CatalogStatsSerializer(get_catalog_stats()).data)
 
-class CategoryViewSet(viewsets.ModelViewSet):
+
+class CategoryViewSet(ReplicaReadMixin, CachedResponseMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_dependencies = ('category',)
 
 
-class BrandViewSet(viewsets.ModelViewSet):
+class BrandViewSet(ReplicaReadMixin, CachedResponseMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Brand.objects.all()
     serializer_class = BrandSerializer
     permission_classes = [IsAuthenticated]
+    cache_dependencies = ('brand',)
+
 
+class ProductViewSet(IdentityMapMixin, ReplicaReadMixin, CachedResponseMixin, EagerLoadingMixin, StreamingListMixin, viewsets.ModelViewSet):
+    queryset = Product.objects.with_total_price()
+    cache_dependencies = ('product', 'brand', 'category')
+    filter_backends = [OrderingFilter, RangeFilterBackend, RelatedFilterBackend, BooleanFilterBackend]
+    ordering_fields = ['id', 'price', 'total_price']
+    range_filter_fields = ['price', 'total_price']
+    related_filter_fields = ['brand', 'category']
+    boolean_filters = {'in_stock': Q(stock__gt=0)}
+    ordering = ['id']
+    cached_actions = ('list', 'retrieve', 'search')
 
-class ProductViewSet(viewsets.ModelViewSet):
-    queryset = Product.objects.all()
-    
     def get_serializer_class(self):
+        if self.action == 'bulk':
+            return BulkProductSerializer
         if self.request.method in ['POST', 'PUT', 'PATCH']:
             return ProductSerializer
+        if self.uses_listing():
+            return ProductListingSerializer
         return RetrieveProductSerializer
+
+    def uses_listing(self):
+        # ?expand= collapses nested serializers, which the listing has none of.
+        return (
+            self.action in ('list', 'stream', 'search')
+            and get_product_listing_setting('DENORMALIZED_READS')
+            and 'expand' not in self.request.query_params
+        )
+
+    @action(detail=False, methods=['get'])
+    def search(self, request, *args, **kwargs):
+        """
+        Products whose name, brand or categories contain every word of ?q=
+        (as a word prefix), best match first. The list filters, ?ordering=
+        and cursor pagination apply as on the list.
+        """
+        expression = build_match_expression(request.query_params.get('q', ''))
+        if expression is None:
+            raise ValidationError({'q': ['Enter at least one word to search for.']})
+        response = self.get_cached_response(request)
+        if response is not None:
+            return response
+
+        # Ranks are bm25 scores, lower is better.
+        self.ordering = ['search_rank']
+        queryset = self.filter_queryset(search_products(self.get_queryset(), expression))
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['post', 'patch', 'delete'])
+    def bulk(self, request, *args, **kwargs):
+        """
+        Create (POST), partially update (PATCH) or delete (DELETE, a list of
+        ids) many products at once. Invalid items are reported by index and
+        skipped; the valid ones are written in a single transaction.
+        """
+        if request.method == 'DELETE':
+            return self.bulk_destroy(request)
+
+        instance = None
+        if request.method == 'PATCH' and isinstance(request.data, list):
+            ids = [parse_pk(item.get('id')) for item in request.data if isinstance(item, dict)]
+            instance = self.get_queryset().in_bulk([pk for pk in ids if pk is not None])
+        serializer = self.get_serializer(
+            instance, data=request.data, many=True, partial=request.method == 'PATCH'
+        )
+        # Only a malformed payload (not a list) fails here; per-item errors
+        # are collected by the list serializer.
+        serializer.is_valid(raise_exception=True)
+        products = iter(serializer.save())
+
+        results, written = [], []
+        for index, attrs in enumerate(serializer.validated_data):
+            if attrs is None:
+                results.append({'index': index, 'errors': serializer.item_errors[index]})
+            else:
+                product = next(products)
+                written.append(product.pk)
+                results.append({'index': index, 'id': product.pk})
+        if written:
+            products_bulk_changed.send(sender=Product, product_ids=written)
+
+        if not written:
+            status_code = status.HTTP_400_BAD_REQUEST
+        elif request.method == 'POST':
+            status_code = status.HTTP_201_CREATED
+        else:
+            status_code = status.HTTP_200_OK
+        return Response(results, status=status_code)
+
+    def bulk_destroy(self, request):
+        if not isinstance(request.data, list):
+            return Response(
+                {'non_field_errors': ['Expected a list of ids.']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        ids = [parse_pk(pk) for pk in request.data]
+        existing = set(
+            self.get_queryset().filter(pk__in=[pk for pk in ids if pk is not None])
+            .values_list('pk', flat=True)
+        )
+        Product.objects.filter(pk__in=existing).delete()
+
+        results = []
+        for index, pk in enumerate(ids):
+            if pk in existing:
+                results.append({'index': index, 'id': pk})
+            else:
+                results.append({'index': index, 'errors': {'id': ['Object with this id does not exist.']}})
+        return Response(results, status=status.HTTP_200_OK)